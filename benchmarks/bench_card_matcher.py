@@ -0,0 +1,110 @@
+"""
+bench_card_matcher.py
+---------------------
+Throughput of CardMatcher vs. a full difflib.get_close_matches scan.
+
+Queries are the real non-exact OCR inputs stored in
+data/drafted_decks/*/detailed OCR/*.csv (the ones that reach the fuzzy path in
+validate_card), matched against the real 540-card cube and against synthetic
+10k / 50k-card lists built from the cube's own vocabulary. Every result is
+checked against difflib so the index can't silently change a match.
+
+Usage:
+    python benchmarks/bench_card_matcher.py [--sizes 10000 50000] [--baseline-queries 200]
+"""
+
+import argparse
+import csv
+import glob
+import os
+import random
+import sys
+import time
+from difflib import get_close_matches
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+from card_matcher import CardMatcher
+
+CARDLIST_FILE = os.path.join(ROOT, 'data', 'cardlist', 'dimlas5_cardlist.csv')
+DETAILED_GLOB = os.path.join(ROOT, 'data', 'drafted_decks', '*', 'detailed OCR', 'detailed_*.csv')
+CUTOFF        = 0.65
+
+
+def load_cube():
+    with open(CARDLIST_FILE, 'r', encoding='utf-8', newline='') as f:
+        return sorted({row['name'].strip() for row in csv.DictReader(f) if row['name'].strip()})
+
+
+def load_fuzzy_queries(cube):
+    """OCR inputs from the stored drafts that are not an exact (case-insensitive) cube hit."""
+    cube_lower = {c.lower() for c in cube}
+    queries = []
+    for path in sorted(glob.glob(DETAILED_GLOB)):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                text = row['ocr_input']
+                if text and text.lower() not in cube_lower:
+                    queries.append(text)
+    return queries
+
+
+def synthetic_cube(cube, size, seed=0):
+    """Grow the cube to `size` unique names made of words from real card names."""
+    rng   = random.Random(seed)
+    words = sorted({w for name in cube for w in name.split()})
+    cards = set(cube)
+    while len(cards) < size:
+        cards.add(' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))))
+    return sorted(cards)
+
+
+def time_queries(fn, queries):
+    start   = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return time.perf_counter() - start, results
+
+
+def run(label, cards, queries, baseline_queries):
+    build_start = time.perf_counter()
+    matcher     = CardMatcher(cards, cutoff=CUTOFF)
+    build_time  = time.perf_counter() - build_start
+
+    idx_time, idx_results = time_queries(matcher.best_match, queries)
+
+    # The full difflib scan gets slow on big lists, so only replay a sample
+    sample = queries[:baseline_queries]
+    ref_time, ref_results = time_queries(
+        lambda q: next(iter(get_close_matches(q, cards, n=1, cutoff=CUTOFF)), None), sample)
+    sample_time, _ = time_queries(matcher.best_match, sample)
+    mismatches = sum(1 for a, b in zip(idx_results, ref_results) if a != b)
+
+    idx_qps = len(queries) / idx_time
+    ref_qps = len(sample) / ref_time
+    print(f'{label:>9} | {len(cards):>6} cards | build {build_time * 1000:7.1f} ms | '
+          f'index {idx_qps:7.0f} q/s | difflib {ref_qps:5.0f} q/s | '
+          f'speedup {ref_time / sample_time:5.1f}x | mismatches {mismatches}/{len(sample)}')
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10_000, 50_000])
+    parser.add_argument('--baseline-queries', type=int, default=200,
+                        help='queries replayed through difflib per list (default: 200)')
+    args = parser.parse_args()
+
+    cube    = load_cube()
+    queries = load_fuzzy_queries(cube)
+    print(f'{len(queries)} fuzzy queries from stored drafts\n')
+
+    mismatches = run('cube', cube, queries, args.baseline_queries)
+    for size in args.sizes:
+        mismatches += run('synthetic', synthetic_cube(cube, size), queries, args.baseline_queries)
+
+    if mismatches:
+        sys.exit(f'\n{mismatches} result(s) differ from difflib')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+bench_card_search.py
+--------------------
+Per-keystroke latency of the deck editor's "Add missing card" search:
+CardSearchIndex vs. the case-insensitive substring scan it replaced.
+
+Typing is simulated on every cube name (one query per prefix, as Streamlit
+reruns on each keystroke), on the real cube and on synthetic 10k / 50k-card
+lists. Quality: for each corrected or unmatched OCR input in
+data/drafted_decks/*/detailed OCR/*.csv whose reviewed name is known, is that
+name among the top 5 results when the raw OCR text is pasted into the box.
+
+Usage:
+    python benchmarks/bench_card_search.py [--sizes 10000 50000] [--typed-names 200]
+"""
+
+import argparse
+import csv
+import glob
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+from card_matcher import CardSearchIndex
+from metrics import percentile
+from bench_card_matcher import load_cube, synthetic_cube
+
+DETAILED_GLOB = os.path.join(ROOT, 'data', 'drafted_decks', '*', 'detailed OCR', 'detailed_*.csv')
+TOP_N         = 5
+
+
+def substring_search(cards, query, limit):
+    """What the editor did before: str.contains(query, case=False) over the whole list."""
+    query = query.lower()
+    return [c for c in cards if query in c.lower()][:limit]
+
+
+def keystroke_queries(cards, typed_names, seed=0):
+    names = random.Random(seed).sample(cards, min(typed_names, len(cards)))
+    return [name[:k] for name in names for k in range(1, len(name) + 1)]
+
+
+def load_ocr_queries():
+    """(ocr_input, official_name) of the corrected detections of the stored drafts."""
+    pairs = []
+    for path in sorted(glob.glob(DETAILED_GLOB)):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            pairs.extend((r['ocr_input'], r['official_name']) for r in csv.DictReader(f)
+                         if r['status'] == 'corrected' and r['official_name'])
+    return pairs
+
+
+def time_each(fn, queries):
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def run(label, cards, typed_names):
+    build_start = time.perf_counter()
+    index       = CardSearchIndex(cards)
+    build_time  = time.perf_counter() - build_start
+
+    queries = keystroke_queries(cards, typed_names)
+    idx     = time_each(lambda q: index.search(q, limit=50), queries)
+    ref     = time_each(lambda q: substring_search(cards, q, 50), queries)
+    print(f'{label:>9} | {len(cards):>6} cards | build {build_time * 1000:7.1f} ms | {len(queries):>5} keystrokes | '
+          f'index p50 {percentile(idx, 50) * 1000:6.3f} / p95 {percentile(idx, 95) * 1000:6.3f} ms | '
+          f'scan p50 {percentile(ref, 50) * 1000:6.3f} / p95 {percentile(ref, 95) * 1000:6.3f} ms')
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10_000, 50_000])
+    parser.add_argument('--typed-names', type=int, default=200, help='names typed out per list (default: 200)')
+    args = parser.parse_args()
+
+    cube  = load_cube()
+    index = run('cube', cube, args.typed_names)
+    for size in args.sizes:
+        run('synthetic', synthetic_cube(cube, size), args.typed_names)
+
+    pairs = load_ocr_queries()
+    if pairs:
+        found_idx = sum(name in index.search(text, limit=TOP_N) for text, name in pairs)
+        found_ref = sum(name in substring_search(cube, text, TOP_N) for text, name in pairs)
+        print(f'\n{len(pairs)} corrected OCR inputs pasted as queries: reviewed name in top {TOP_N} '
+              f'index {found_idx / len(pairs):.1%}, substring scan {found_ref / len(pairs):.1%}')
+
+
+if __name__ == '__main__':
+    main()
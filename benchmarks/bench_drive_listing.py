@@ -0,0 +1,133 @@
+"""
+bench_drive_listing.py
+----------------------
+Drive round trips needed to walk the Season -> Pictures -> draft tree and list
+a draft's photos, with DriveSource vs. the original one-call-per-folder walk.
+
+Runs against an in-memory fake of the Drive v3 `files().list` endpoint (only
+the query forms image_sources.py sends) that pages like the real API: 100
+results per page unless pageSize is given, at most 1000. Each call sleeps
+--latency-ms to stand in for the network. The original walk never followed
+nextPageToken, so the benchmark also reports files it silently missed.
+
+Usage:
+    python benchmarks/bench_drive_listing.py [--seasons 12] [--drafts 10] [--players 150] [--latency-ms 80]
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+from image_sources import DriveSource, FOLDER_MIME_TYPE, SEASON_PATTERN, DRAFT_PATTERN, draft_date, is_player_file
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE     = 1000
+
+
+class FakeDrive:
+    """files().list(q, fields, pageSize, pageToken).execute() over an in-memory folder tree."""
+
+    def __init__(self, files, latency):
+        self.all     = files    # [{'id', 'name', 'mimeType', 'parents', ...}]
+        self.latency = latency
+        self.calls   = 0
+
+    def files(self):
+        return self
+
+    def list(self, q, fields=None, pageSize=None, pageToken=None):
+        parents  = set(re.findall(r"'([^']+)' in parents", q))
+        mime_eq  = re.search(r"mimeType='([^']+)'", q)
+        mime_has = re.search(r"mimeType contains '([^']+)'", q)
+        matches  = [f for f in self.all
+                    if parents & set(f['parents'])
+                    and (not mime_eq or f['mimeType'] == mime_eq.group(1))
+                    and (not mime_has or mime_has.group(1) in f['mimeType'])]
+        size  = min(pageSize or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        start = int(pageToken or 0)
+        page  = {'files': [dict(f) for f in matches[start:start + size]]}
+        if start + size < len(matches):
+            page['nextPageToken'] = str(start + size)
+        self._page = page
+        return self
+
+    def execute(self):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._page
+
+
+def build_tree(n_seasons, n_drafts, n_players):
+    files = []
+    def add(name, parent, mime=FOLDER_MIME_TYPE):
+        files.append({'id': f'id{len(files)}', 'name': name, 'mimeType': mime, 'parents': [parent],
+                      'modifiedTime': '2026-01-01T00:00:00.000Z', 'md5Checksum': str(len(files))})
+        return files[-1]['id']
+    for s in range(1, n_seasons + 1):
+        season   = add(f'Season {s}', 'root')
+        add('Decklists', season)
+        pictures = add('Pictures', season)
+        for d in range(1, n_drafts + 1):
+            draft = add(f'2026{s:02d}{d:02d} Draft {d}', pictures)
+            for p in range(n_players):
+                add(f'Player {p}.jpg', draft, 'image/jpeg')
+            add('Results.jpg', draft, 'image/jpeg')
+    return files
+
+
+def original_walk(service):
+    """The walk before paging and batching: one list call per folder, default page size."""
+    def folders(parent_id, pattern=None):
+        q = f"'{parent_id}' in parents and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+        found = service.files().list(q=q, fields='files(id, name)').execute().get('files', [])
+        return [f for f in found if not pattern or re.search(pattern, f['name'])]
+    newest = None
+    for season in folders('root', SEASON_PATTERN):
+        pictures = next(f for f in folders(season['id']) if f['name'].lower() == 'pictures')
+        for draft in folders(pictures['id'], DRAFT_PATTERN):
+            if newest is None or draft_date(draft) > draft_date(newest):
+                newest = draft
+    q = f"'{newest['id']}' in parents and trashed=false and mimeType contains 'image/'"
+    files = service.files().list(q=q, fields='files(id, name, mimeType, modifiedTime, md5Checksum)').execute().get('files', [])
+    return [f for f in files if is_player_file(f['name'])]
+
+
+def source_walk(service, tree_cache):
+    source = DriveSource(root_id='root', service=service, tree_cache=tree_cache)
+    newest = max((d for s in source.seasons() for d in source.drafts(s)), key=draft_date)
+    return source.player_files(newest)
+
+
+def measure(label, fn, service):
+    service.calls = 0
+    start  = time.perf_counter()
+    result = fn()
+    print(f'{label:<28} {service.calls:>4} list call(s) | {time.perf_counter() - start:6.2f} s | {len(result):>4} player photo(s)')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seasons', type=int, default=12)
+    parser.add_argument('--drafts', type=int, default=10, help='drafts per season')
+    parser.add_argument('--players', type=int, default=150, help='player photos per draft (over 100 needs paging)')
+    parser.add_argument('--latency-ms', type=float, default=80)
+    args = parser.parse_args()
+
+    service = FakeDrive(build_tree(args.seasons, args.drafts, args.players), args.latency_ms / 1000)
+    print(f'{args.seasons} seasons x {args.drafts} drafts x {args.players} photos, '
+          f'{args.latency_ms:.0f} ms per call\n')
+    with tempfile.TemporaryDirectory() as tmp:
+        tree_cache = os.path.join(tmp, 'drive_tree.json')
+        measure('original walk', lambda: original_walk(service), service)
+        measure('DriveSource, cold cache', lambda: source_walk(service, tree_cache), service)
+        measure('DriveSource, cached tree', lambda: source_walk(service, tree_cache), service)
+
+
+if __name__ == '__main__':
+    main()
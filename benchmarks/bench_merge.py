@@ -0,0 +1,155 @@
+"""
+bench_merge.py
+--------------
+Micro-benchmark of parse_and_merge_card_names against the original
+rescanning implementation.
+
+The stored drafts only keep the merged OCR text, not the boxes, so each
+player's recorded `ocr_input`s from data/drafted_decks/*/detailed OCR/ are laid
+out as a synthetic deck photo: one card name per row, split into one box per
+word (what EasyOCR typically returns), in several columns, with some jitter and
+mana-cost noise. Denser photos are made by stacking several players side by
+side. Every grouping is checked against the reference implementation.
+
+Usage:
+    python benchmarks/bench_merge.py [--repeat 5]
+"""
+
+import argparse
+import csv
+import glob
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+from ocr_merge import boxes_are_adjacent, merge_bboxes, should_keep_text, parse_and_merge_card_names
+
+DETAILED_GLOB = os.path.join(ROOT, 'data', 'drafted_decks', '*', 'detailed OCR', 'detailed_*.csv')
+
+CHAR_WIDTH    = 14
+TEXT_HEIGHT   = 24
+ROW_HEIGHT    = 60
+WORD_GAP      = 12
+COLUMN_WIDTH  = 900
+ROWS_PER_COL  = 15
+
+
+def reference_parse_and_merge(ocr_results):
+    """The original implementation: rescan every detection after each addition."""
+    filtered = []
+    for bbox, text, confidence in ocr_results:
+        if confidence < 0.05: continue
+        text = text.strip()
+        if not should_keep_text(text): continue
+        filtered.append({
+            'bbox': bbox, 'text': text, 'confidence': confidence,
+            'x_min': min(p[0] for p in bbox), 'y_position': bbox[0][1]
+        })
+
+    merged_cards = []
+    used = set()
+    for i, det in enumerate(filtered):
+        if i in used: continue
+        group = [det]; used.add(i)
+        changed = True
+        while changed:
+            changed = False
+            for j, other in enumerate(filtered):
+                if j in used: continue
+                if any(boxes_are_adjacent(g['bbox'], other['bbox']) for g in group):
+                    group.append(other); used.add(j); changed = True; break
+        group.sort(key=lambda x: x['x_min'])
+        merged_cards.append({
+            'text':       ' '.join(d['text'] for d in group),
+            'confidence': sum(d['confidence'] for d in group) / len(group),
+            'bbox':       merge_bboxes([d['bbox'] for d in group]),
+            'y_position': group[0]['y_position']
+        })
+
+    merged_cards.sort(key=lambda x: x['y_position'])
+    return merged_cards
+
+
+def load_recorded_decks():
+    decks = []
+    for path in sorted(glob.glob(DETAILED_GLOB)):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            texts = [row['ocr_input'] for row in csv.DictReader(f) if row['ocr_input']]
+        if texts:
+            decks.append(texts)
+    return decks
+
+
+def layout_detections(texts, rng, x_offset=0):
+    """EasyOCR-style [(bbox, text, confidence)] for card names laid out in columns."""
+    detections = []
+    for n, name in enumerate(texts):
+        col, row = divmod(n, ROWS_PER_COL)
+        x = x_offset + col * COLUMN_WIDTH + rng.randint(0, 8)
+        y = row * ROW_HEIGHT + rng.randint(-4, 4)
+        for word in name.split():
+            width = len(word) * CHAR_WIDTH
+            skew  = rng.randint(-2, 2)
+            bbox  = [[x, y + skew], [x + width, y], [x + width, y + TEXT_HEIGHT], [x, y + TEXT_HEIGHT + skew]]
+            detections.append((bbox, word, round(rng.uniform(0.02, 1.0), 4)))
+            x += width + WORD_GAP + rng.randint(-3, 3)
+        if rng.random() < 0.3:
+            # Mana cost in the top-right corner of the card
+            cx = x_offset + col * COLUMN_WIDTH + 600
+            detections.append(([[cx, y], [cx + 40, y], [cx + 40, y + 20], [cx, y + 20]], '2U', 0.5))
+    rng.shuffle(detections)
+    return detections
+
+
+def build_photos(decks, players_per_photo, seed=0):
+    rng    = random.Random(seed)
+    photos = []
+    for start in range(0, len(decks) - players_per_photo + 1, players_per_photo):
+        detections = []
+        for k, texts in enumerate(decks[start:start + players_per_photo]):
+            cols = -(-len(texts) // ROWS_PER_COL)
+            detections += layout_detections(texts, rng, x_offset=k * (cols + 1) * COLUMN_WIDTH)
+        photos.append(detections)
+    return photos
+
+
+def time_fn(fn, photos, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for detections in photos:
+            fn(detections)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    decks = load_recorded_decks()
+    print(f'{len(decks)} recorded decks\n')
+
+    mismatches = 0
+    for players_per_photo in (1, 3, 6):
+        photos = build_photos(decks, players_per_photo)
+        avg    = sum(len(p) for p in photos) / len(photos)
+        mismatches += sum(1 for p in photos if parse_and_merge_card_names(p) != reference_parse_and_merge(p))
+
+        new_time = time_fn(parse_and_merge_card_names, photos, args.repeat)
+        ref_time = time_fn(reference_parse_and_merge, photos, max(1, args.repeat // 5))
+        print(f'{players_per_photo} deck(s)/photo | {len(photos):>2} photos | {avg:6.0f} boxes avg | '
+              f'original {ref_time / len(photos) * 1000:8.2f} ms/photo | '
+              f'sweep {new_time / len(photos) * 1000:6.2f} ms/photo | speedup {ref_time / new_time:6.1f}x')
+
+    if mismatches:
+        sys.exit(f'\n{mismatches} photo(s) grouped differently from the original implementation')
+    print('\nAll groupings identical to the original implementation')
+
+
+if __name__ == '__main__':
+    main()
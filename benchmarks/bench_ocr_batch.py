@@ -0,0 +1,77 @@
+"""
+bench_ocr_batch.py
+------------------
+Per-photo readtext() vs. batched extract_text_from_images() throughput.
+
+OCRs the stored photos (data/clean/*/clean images/annotated_*.jpeg by default)
+one at a time with recognizer batch size 1 (EasyOCR's default), then one at a
+time with RECOGNIZER_BATCH_SIZE, then in groups of --batch-images photos, and
+reports photos per second for each. Needs EasyOCR but no network.
+
+Usage:
+    python benchmarks/bench_ocr_batch.py [--cpu] [--batch-images 4] [--limit 8]
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import extractor_and_OCR as extractor
+from image_preprocess import load_image, prepare_for_ocr
+
+IMAGE_GLOB = os.path.join(ROOT, 'data', 'clean', '*', 'clean images', 'annotated_*.jpeg')
+
+
+def per_photo(images_bytes, reader, batch_size):
+    preprocess = extractor.DEFAULT_PREPROCESS
+    for image_bytes in images_bytes:
+        array, _ = prepare_for_ocr(load_image(image_bytes, preprocess), preprocess, reader)
+        reader.readtext(array, detail=1, batch_size=batch_size)
+
+
+def batched(images_bytes, reader, batch_images, batch_size):
+    for start in range(0, len(images_bytes), batch_images):
+        extractor.extract_text_from_images(images_bytes[start:start + batch_images], reader, batch_size=batch_size)
+
+
+def report(label, fn, n_photos):
+    start   = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    print(f'{label:<40} {n_photos / seconds:6.2f} photos/s  ({seconds:.1f}s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', default=IMAGE_GLOB, help='glob of photos to OCR')
+    parser.add_argument('--batch-images', type=int, default=extractor.OCR_BATCH_IMAGES)
+    parser.add_argument('--batch-size', type=int, default=extractor.RECOGNIZER_BATCH_SIZE)
+    parser.add_argument('--cpu', action='store_true', help='force CPU OCR')
+    parser.add_argument('--limit', type=int, default=8, help='number of photos (default: 8)')
+    args = parser.parse_args()
+
+    photos = sorted(glob.glob(args.images))[:args.limit]
+    if not photos:
+        sys.exit(f'No photos match {args.images}')
+    images_bytes = []
+    for path in photos:
+        with open(path, 'rb') as f:
+            images_bytes.append(f.read())
+
+    reader = extractor.get_reader(gpu=not args.cpu and extractor.OCR_GPU)
+    per_photo(images_bytes[:1], reader, 1)  # warm-up
+
+    n = len(images_bytes)
+    print(f'{n} photo(s)\n')
+    report('readtext, recognizer batch 1', lambda: per_photo(images_bytes, reader, 1), n)
+    report(f'readtext, recognizer batch {args.batch_size}', lambda: per_photo(images_bytes, reader, args.batch_size), n)
+    report(f'batched {args.batch_images} photos, recognizer batch {args.batch_size}',
+           lambda: batched(images_bytes, reader, args.batch_images, args.batch_size), n)
+
+
+if __name__ == '__main__':
+    main()
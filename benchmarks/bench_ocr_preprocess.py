@@ -0,0 +1,102 @@
+"""
+bench_ocr_preprocess.py
+-----------------------
+OCR time and match rate at different preprocessing settings.
+
+Runs the full OCR -> merge -> match_deck path of extractor_and_OCR.py on the
+stored photos (data/clean/*/clean images/annotated_*.jpeg by default) once per
+`--target-text-height` value and reports seconds per photo and recall against
+the reviewed decks in data/final/{draft}.csv (fraction of a player's final
+scryfall IDs that OCR found). Needs EasyOCR but no network.
+
+Usage:
+    python benchmarks/bench_ocr_preprocess.py [--heights 0 48 32 24] [--grayscale] [--cpu] [--limit 6]
+"""
+
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import extractor_and_OCR as extractor
+from deck_matcher import match_deck
+from image_preprocess import PreprocessSettings
+from ocr_merge import parse_and_merge_card_names
+
+IMAGE_GLOB = os.path.join(ROOT, 'data', 'clean', '*', 'clean images', 'annotated_*.jpeg')
+FINAL_DIR  = os.path.join(ROOT, 'data', 'final')
+
+
+def load_final_decks():
+    """{(draft, player): set of scryfall IDs} from the reviewed decks."""
+    decks = {}
+    for path in glob.glob(os.path.join(FINAL_DIR, '*.csv')):
+        draft = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                decks.setdefault((draft, row['player']), set()).add(row['scryfallId'])
+    return decks
+
+
+def photo_key(path):
+    draft  = os.path.basename(os.path.dirname(os.path.dirname(path)))
+    player = re.sub(r'^annotated_', '', os.path.splitext(os.path.basename(path))[0])
+    return draft, player
+
+
+def run(photos, final_decks, settings, reader):
+    cube       = extractor.get_cube()
+    ocr_time   = 0.0
+    found      = 0
+    expected   = 0
+    for path in photos:
+        with open(path, 'rb') as f:
+            image_bytes = f.read()
+        start = time.perf_counter()
+        _, ocr_results = extractor.extract_text_from_image(image_bytes, reader, settings)
+        ocr_time += time.perf_counter() - start
+
+        texts   = [card['text'] for card in parse_and_merge_card_names(ocr_results)]
+        matches = match_deck(texts, cube.cards_lower, cube.matcher)
+        ids     = {cube.scryfall_ids.get(name) for _, name in matches if name}
+        final   = final_decks.get(photo_key(path), set())
+        found    += len(ids & final)
+        expected += len(final)
+    return ocr_time / len(photos), found / expected if expected else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', default=IMAGE_GLOB, help='glob of photos to OCR')
+    parser.add_argument('--heights', type=int, nargs='*', default=[0, 48, 32, 24],
+                        help='target text heights to compare; 0 = no downscaling')
+    parser.add_argument('--grayscale', action='store_true')
+    parser.add_argument('--cpu', action='store_true', help='force CPU OCR')
+    parser.add_argument('--limit', type=int, default=None, help='only use the first N photos')
+    args = parser.parse_args()
+
+    photos = sorted(glob.glob(args.images))[:args.limit]
+    if not photos:
+        sys.exit(f'No photos match {args.images}')
+    final_decks = load_final_decks()
+    reader      = extractor.get_reader(gpu=not args.cpu and extractor.OCR_GPU)
+
+    # Warm-up so model initialisation is not charged to the first setting
+    with open(photos[0], 'rb') as f:
+        extractor.extract_text_from_image(f.read(), reader, PreprocessSettings())
+
+    print(f'{len(photos)} photo(s)\n')
+    print(f'{"target height":>13} | {"s/photo":>8} | {"recall":>7}')
+    for height in args.heights:
+        settings = PreprocessSettings(target_text_height=height or None, grayscale=args.grayscale)
+        seconds, recall = run(photos, final_decks, settings, reader)
+        print(f'{height or "full":>13} | {seconds:8.2f} | {recall:7.1%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""
+bench_recorded_drafts.py
+------------------------
+Replays the drafts stored in data/ through the pipeline's CPU stages and
+reports throughput, latency percentiles and accuracy, so a speed-up can't
+silently cost match quality.
+
+    validate  every `ocr_input` of data/drafted_decks/*/detailed OCR/*.csv
+              through extractor_and_OCR.validate_card (fresh duplicate set
+              per player). Accuracy: agreement with the recorded status /
+              official name, and precision / recall of the matched Scryfall
+              IDs against the reviewed decks in data/final/.
+    deck      the same detections, one player photo at a time, through
+              deck_matcher.match_deck (joint one-to-one assignment). Same
+              accuracy measures, plus how many detections differ from
+              validate_card.
+    merge     synthetic EasyOCR boxes built from the same decks (see
+              bench_merge.py) through parse_and_merge_card_names. Accuracy:
+              photos grouped exactly like the original implementation, and
+              share of card names reassembled exactly (below 1 by design: the
+              layout has one box per word, and short or low-confidence words are
+              filtered before merging, which splits some names).
+    export    each data/zip/*_tournament_export.zip's matches file plus the
+              matching data/final/ CSV through build_tournament_export.build_export.
+              Accuracy: rebuilt drafted_decks CSV identical to the stored one.
+
+Usage:
+    python benchmarks/bench_recorded_drafts.py [--repeat 5] [--only validate deck merge export]
+                                              [--json results.json] [--min-recall 0.9] [--min-agreement 0.99]
+"""
+
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+from metrics import percentile
+from bench_merge import build_photos, load_recorded_decks, reference_parse_and_merge
+
+DRAFTED_DECKS_DIR = os.path.join(ROOT, 'data', 'drafted_decks')
+FINAL_DIR         = os.path.join(ROOT, 'data', 'final')
+ZIP_DIR           = os.path.join(ROOT, 'data', 'zip')
+
+# validate_card status -> status written to the detailed CSV
+RECORDED_STATUS = {'exact': 'exact', 'exact_corrected': 'exact', 'fuzzy': 'corrected',
+                   'unmatched': 'unmatched', 'duplicate': 'duplicate'}
+MATCHED         = ('exact', 'exact_corrected', 'fuzzy')
+
+
+def latency_stats(latencies, seconds, items):
+    """Throughput plus p50/p95/p99/max latency in milliseconds."""
+    ordered = sorted(latencies)
+    return {
+        'items':       items,
+        'per_second':  round(items / seconds, 1) if seconds else None,
+        'p50_ms':      round(percentile(ordered, 50) * 1000, 4),
+        'p95_ms':      round(percentile(ordered, 95) * 1000, 4),
+        'p99_ms':      round(percentile(ordered, 99) * 1000, 4),
+        'max_ms':      round(ordered[-1] * 1000, 4),
+    }
+
+
+def load_detailed_drafts():
+    """{draft: {player: [recorded detailed rows]}} from data/drafted_decks/."""
+    drafts = {}
+    for draft_dir in sorted(glob.glob(os.path.join(DRAFTED_DECKS_DIR, '*'))):
+        players = {}
+        for path in sorted(glob.glob(os.path.join(draft_dir, 'detailed OCR', 'detailed_*.csv'))):
+            player = os.path.basename(path)[len('detailed_'):-len('.csv')]
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                players[player] = [row for row in csv.DictReader(f) if row['ocr_input']]
+        if players:
+            drafts[os.path.basename(draft_dir)] = players
+    return drafts
+
+
+def load_final_decks(draft):
+    """{player: Counter(scryfallId)} of the reviewed deck lists, or None if the draft has none."""
+    path = os.path.join(FINAL_DIR, f'{draft}.csv')
+    if not os.path.exists(path):
+        return None
+    decks = defaultdict(Counter)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            decks[row['player']][row['scryfallId']] += int(row.get('quantity') or 1)
+    return decks
+
+
+def accuracy(drafts, match_player, cube):
+    """Agreement with the recorded run and precision / recall against data/final of
+    `match_player(texts) -> [(status, official_name)]`.
+    """
+    agree = total = tp = predicted = expected = 0
+    per_draft = {}
+    for draft, players in drafts.items():
+        final = load_final_decks(draft)
+        d_tp = d_predicted = d_expected = 0
+        for player, rows in players.items():
+            ids = Counter()
+            for row, (status, official_name) in zip(rows, match_player([row['ocr_input'] for row in rows])):
+                total += 1
+                agree += (RECORDED_STATUS[status] == row['status'] and (official_name or '') == row['official_name'])
+                if status in MATCHED:
+                    ids[cube.scryfall_ids.get(official_name, '')] += 1
+            if final is not None and player in final:
+                d_tp        += sum((ids & final[player]).values())
+                d_predicted += sum(ids.values())
+                d_expected  += sum(final[player].values())
+        if d_predicted:
+            per_draft[draft] = {'precision': round(d_tp / d_predicted, 4), 'recall': round(d_tp / d_expected, 4)}
+        tp, predicted, expected = tp + d_tp, predicted + d_predicted, expected + d_expected
+
+    return {
+        'agreement': round(agree / total, 4),
+        'precision': round(tp / predicted, 4) if predicted else None,
+        'recall':    round(tp / expected, 4) if expected else None,
+        'per_draft': per_draft,
+    }
+
+
+def greedy_matches(extractor):
+    def match_player(texts):
+        seen = set()
+        return [extractor.validate_card(text, seen) for text in texts]
+    return match_player
+
+
+def bench_validate(repeat):
+    import extractor_and_OCR as extractor
+    cube   = extractor.get_cube()
+    drafts = load_detailed_drafts()
+
+    latencies, best = [], float('inf')
+    for _ in range(repeat):
+        run_latencies = []
+        start = time.perf_counter()
+        for players in drafts.values():
+            for rows in players.values():
+                seen = set()
+                for row in rows:
+                    t = time.perf_counter()
+                    extractor.validate_card(row['ocr_input'], seen)
+                    run_latencies.append(time.perf_counter() - t)
+        best = min(best, time.perf_counter() - start)
+        latencies = run_latencies
+
+    result = latency_stats(latencies, best, len(latencies))
+    result.update(accuracy(drafts, greedy_matches(extractor), cube))
+    return result
+
+
+def bench_deck(repeat):
+    import extractor_and_OCR as extractor
+    from deck_matcher import match_deck
+    cube   = extractor.get_cube()
+    drafts = load_detailed_drafts()
+    photos = [[row['ocr_input'] for row in rows] for players in drafts.values() for rows in players.values()]
+
+    def match_player(texts):
+        return match_deck(texts, cube.cards_lower, cube.matcher)
+
+    latencies, best = [], float('inf')
+    for _ in range(repeat):
+        run_latencies = []
+        start = time.perf_counter()
+        for texts in photos:
+            t = time.perf_counter()
+            match_player(texts)
+            run_latencies.append(time.perf_counter() - t)
+        best = min(best, time.perf_counter() - start)
+        latencies = run_latencies
+
+    greedy = greedy_matches(extractor)
+    result = latency_stats(latencies, best, len(photos))
+    result.update(accuracy(drafts, match_player, cube))
+    result['changed_vs_greedy'] = sum(a != b for texts in photos for a, b in zip(greedy(texts), match_player(texts)))
+    return result
+
+
+def bench_merge(repeat):
+    from ocr_merge import parse_and_merge_card_names
+    decks  = load_recorded_decks()
+    photos = build_photos(decks, players_per_photo=1)
+
+    latencies, best = [], float('inf')
+    for _ in range(repeat):
+        run_latencies = []
+        start = time.perf_counter()
+        for detections in photos:
+            t = time.perf_counter()
+            parse_and_merge_card_names(detections)
+            run_latencies.append(time.perf_counter() - t)
+        best = min(best, time.perf_counter() - start)
+        latencies = run_latencies
+
+    recovered = names = identical = 0
+    for texts, detections in zip(decks, photos):
+        cards      = parse_and_merge_card_names(detections)
+        identical += cards == reference_parse_and_merge(detections)
+        merged     = Counter(card['text'] for card in cards)
+        recovered += sum((Counter(texts) & merged).values())
+        names     += len(texts)
+
+    result = latency_stats(latencies, best, len(photos))
+    result['boxes_per_photo'] = round(sum(len(p) for p in photos) / len(photos), 1)
+    result['identical_to_reference'] = round(identical / len(photos), 4)
+    result['names_recovered'] = round(recovered / names, 4)
+    return result
+
+
+def bench_export(repeat):
+    from build_tournament_export import build_export
+    cases = []
+    for zip_path in sorted(glob.glob(os.path.join(ZIP_DIR, '*_tournament_export.zip'))):
+        date_prefix = os.path.basename(zip_path)[:-len('_tournament_export.zip')]
+        finals = glob.glob(os.path.join(FINAL_DIR, f'{date_prefix.replace("_", "")}_*.csv'))
+        if not finals:
+            continue
+        with zipfile.ZipFile(zip_path) as zf:
+            matches_name = f'{date_prefix}_matches.csv'
+            matches_text = zf.read(matches_name).decode('utf-8')
+            stored_decks = zf.read(f'{date_prefix}_drafted_decks.csv')
+        cases.append((matches_name, matches_text, finals[0], stored_decks))
+
+    latencies, best, identical = [], float('inf'), 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in range(repeat):
+            run_latencies = []
+            start = time.perf_counter()
+            for matches_name, matches_text, final_path, stored_decks in cases:
+                t = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    zip_path = build_export(matches_name, matches_text, final_path, zip_dir=tmp)
+                run_latencies.append(time.perf_counter() - t)
+                if n == 0:
+                    with zipfile.ZipFile(zip_path) as zf:
+                        rebuilt = zf.read(f'{matches_name[:-len("_matches.csv")]}_drafted_decks.csv')
+                    # The stored zips were built on Windows; compare content, not line endings
+                    identical += rebuilt.replace(b'\r\n', b'\n') == stored_decks.replace(b'\r\n', b'\n')
+            best = min(best, time.perf_counter() - start)
+            latencies = run_latencies
+
+    if not cases:
+        return {'items': 0}
+    result = latency_stats(latencies, best, len(cases))
+    result['identical_to_stored'] = round(identical / len(cases), 4)
+    return result
+
+
+BENCHMARKS = {'validate': bench_validate, 'deck': bench_deck, 'merge': bench_merge, 'export': bench_export}
+GATED      = ('deck', 'validate')   # stages checked by --min-recall / --min-agreement; deck is what the extractor runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--json', metavar='PATH', help='also write the results as JSON')
+    parser.add_argument('--min-recall', type=float,
+                        help='fail if deck / validate recall vs data/final drops below this (whichever of them ran)')
+    parser.add_argument('--min-agreement', type=float,
+                        help='fail if deck / validate agreement with the recorded run drops below this (whichever of them ran)')
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only:
+        r = results[name] = BENCHMARKS[name](args.repeat)
+        if not r.get('items'):
+            print(f'{name:<9} no recorded inputs found')
+            continue
+        accuracy = ', '.join(f'{k} {v}' for k, v in r.items()
+                             if k in ('agreement', 'precision', 'recall', 'changed_vs_greedy', 'identical_to_reference',
+                                       'names_recovered', 'identical_to_stored'))
+        print(f'{name:<9} {r["items"]:>5} items | {r["per_second"]:>10,.1f}/s | p50 {r["p50_ms"]:8.3f} ms | '
+              f'p95 {r["p95_ms"]:8.3f} ms | p99 {r["p99_ms"]:8.3f} ms | {accuracy}')
+        for draft, d in r.get('per_draft', {}).items():
+            print(f'{"":<9} {draft:<20} precision {d["precision"]}, recall {d["recall"]}')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    gated    = [name for name in GATED if name in results]
+    if (args.min_recall is not None or args.min_agreement is not None) and not gated:
+        failures.append(f'--min-recall / --min-agreement need one of {", ".join(GATED)} in --only')
+    for name in gated:
+        r = results[name]
+        if args.min_recall is not None and (r.get('recall') or 0) < args.min_recall:
+            failures.append(f'{name} recall {r.get("recall")} < {args.min_recall}')
+        if args.min_agreement is not None and (r.get('agreement') or 0) < args.min_agreement:
+            failures.append(f'{name} agreement {r.get("agreement")} < {args.min_agreement}')
+    if failures:
+        sys.exit('Accuracy regression: ' + '; '.join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+bench_startup.py
+----------------
+Startup cost of extractor_and_OCR.py.
+
+Times, in fresh interpreters, importing the module, `--help`, and a
+`--dry-run` against a small local draft tree, and checks that none of them
+import easyocr or torch. Needs the extractor's light dependencies (numpy,
+Pillow) but no model weights, credentials or network.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT      = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS   = os.path.join(ROOT, 'scripts')
+EXTRACTOR = os.path.join(SCRIPTS, 'extractor_and_OCR.py')
+
+HEAVY_MODULES_CHECK = (
+    'import sys, runpy; sys.argv = [sys.argv[1]] + sys.argv[2:]; '
+    'sys.path.insert(0, {scripts!r}); '
+    'code = 0\n'
+    'try:\n'
+    '    runpy.run_path(sys.argv[0], run_name="__main__")\n'
+    'except SystemExit as e:\n'
+    '    code = e.code or 0\n'
+    'heavy = [m for m in ("easyocr", "torch") if m in sys.modules]\n'
+    'if heavy: sys.exit("loaded " + ", ".join(heavy))\n'
+    'sys.exit(code)'
+)
+
+
+def make_local_tree(root):
+    draft = os.path.join(root, 'Season 1', 'Pictures', '20260101 Draft 1')
+    os.makedirs(draft)
+    for player in ('Andrin', 'Dimlas', 'Guy'):
+        with open(os.path.join(draft, f'{player}.jpg'), 'wb') as f:
+            f.write(b'\xff\xd8\xff\xd9')
+
+
+def time_command(args, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc  = subprocess.run(args, cwd=ROOT, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            sys.exit(f'{" ".join(args)} failed:\n{proc.stdout}{proc.stderr}')
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    check = HEAVY_MODULES_CHECK.format(scripts=SCRIPTS)
+    with tempfile.TemporaryDirectory() as tree:
+        make_local_tree(tree)
+        commands = {
+            'python (baseline)':  [sys.executable, '-c', 'pass'],
+            'import extractor':   [sys.executable, '-c', f'import sys; sys.path.insert(0, {SCRIPTS!r}); '
+                                                         f'import extractor_and_OCR as e; '
+                                                         f'assert "easyocr" not in sys.modules and "torch" not in sys.modules'],
+            '--help':             [sys.executable, '-c', check, EXTRACTOR, '--help'],
+            '--dry-run --local':  [sys.executable, '-c', check, EXTRACTOR, '--dry-run', '--local', tree],
+            '--list --local':     [sys.executable, '-c', check, EXTRACTOR, '--list', '--local', tree],
+        }
+        for label, command in commands.items():
+            print(f'{label:<20} {time_command(command, args.runs) * 1000:8.0f} ms (median of {args.runs})')
+    print('\neasyocr/torch were not imported by any of these')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+bench_variant_lookup.py
+-----------------------
+How many detections the OCR-confusion variant lookup (CardMatcher.variant_match)
+takes off the fuzzy path, and what that saves.
+
+Every `ocr_input` of data/drafted_decks/*/detailed OCR/*.csv is classified the
+way validate_card now resolves it: exact (case-insensitive) hit, variant hit,
+or fuzzy fallback (best_match). Each variant hit is checked against what
+best_match alone returns, so the shortcut can't silently change a match. The
+non-exact inputs are then timed through best_match alone vs. variant_match
+first, on the real cube and on synthetic 10k / 50k-card lists (which also
+show how many cards lose their variant key to a collision).
+
+Usage:
+    python benchmarks/bench_variant_lookup.py [--sizes 10000 50000] [--repeat 3]
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+from card_matcher import CardMatcher
+from bench_card_matcher import CUTOFF, DETAILED_GLOB, load_cube, load_fuzzy_queries, synthetic_cube
+
+
+def load_detections():
+    texts = []
+    for path in sorted(glob.glob(DETAILED_GLOB)):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            texts.extend(row['ocr_input'] for row in csv.DictReader(f) if row['ocr_input'])
+    return texts
+
+
+def best_of(fn, queries, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(label, cards, queries, repeat):
+    build_start = time.perf_counter()
+    matcher     = CardMatcher(cards, cutoff=CUTOFF)
+    build_time  = time.perf_counter() - build_start
+
+    fuzzy   = best_of(matcher.best_match, queries, repeat)
+    variant = best_of(lambda q: matcher.variant_match(q) or matcher.best_match(q), queries, repeat)
+    print(f'{label:>9} | {len(matcher):>6} cards | build {build_time * 1000:7.1f} ms | '
+          f'{len(matcher) - len(matcher.variants):>4} card(s) without a variant key | '
+          f'{len(queries)} non-exact inputs: best_match {fuzzy * 1000:7.1f} ms, '
+          f'variant first {variant * 1000:7.1f} ms ({1 - variant / fuzzy:.0%} less)')
+    return matcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10_000, 50_000])
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs, best one kept (default: 3)')
+    args = parser.parse_args()
+
+    cube       = load_cube()
+    cube_lower = {c.lower() for c in cube}
+    detections = load_detections()
+    queries    = load_fuzzy_queries(cube)
+    matcher    = run('cube', cube, queries, args.repeat)
+    for size in args.sizes:
+        run('synthetic', synthetic_cube(cube, size), queries, args.repeat)
+
+    exact    = sum(text.lower() in cube_lower for text in detections)
+    hits     = [(text, matcher.variant_match(text)) for text in queries if matcher.variant_match(text)]
+    disagree = [(text, card, matcher.best_match(text)) for text, card in hits if matcher.best_match(text) != card]
+    print(f'\n{len(detections)} detections: {exact} exact, {len(hits)} variant, '
+          f'{len(queries) - len(hits)} fuzzy fallback')
+    print(f'variant lookup spares {len(hits) / len(queries):.1%} of the fuzzy lookups '
+          f'({len(hits) / len(detections):.1%} of all detections); '
+          f'agrees with best_match on {len(hits) - len(disagree)}/{len(hits)}')
+    for text, card, fuzzy in disagree:
+        print(f'  {text!r}: variant {card!r}, best_match {fuzzy!r}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,61 @@
 """
 Draft pipeline runner
-Runs the 3 preparation scripts in order, then launches the Deck Editor.
+Runs the preparation scripts as a small dependency graph, then launches the Deck Editor.
+
+    cubecobra_card_list_downloader ──► extractor_and_OCR
+    archetype_decktype_data_downloader                      (independent)
+
+Stages whose dependencies are done run concurrently; their output is prefixed
+with the stage name. A stage is skipped when its outputs are younger than
+--max-age minutes and newer than its dependencies' outputs. The downloaders
+use conditional requests and the extractor runs --incremental, so stages that
+do run are cheap when nothing changed upstream. Per-stage timings are printed
+at the end.
 
 Usage:
-    python run_pipeline.py
+    python run_pipeline.py [--max-age MINUTES] [--force]
 """
 
+import argparse
+import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import NamedTuple
 
 ROOT = Path(__file__).parent
 SCRIPTS = ROOT / "scripts"
+DATA = ROOT / "data"
+
+
+class Stage(NamedTuple):
+    name: str
+    deps: tuple = ()
+    args: tuple = ()
+    outputs: tuple = ()
+
 
-SCRIPTS_TO_RUN = [
-    "cubecobra_card_list_downloader",
-    "extractor_and_OCR",
-    "archetype_decktype_data_downloader",
+STAGES = [
+    Stage("cubecobra_card_list_downloader",
+          outputs=(DATA / "cardlist" / "dimlas5_cardlist.csv",)),
+    Stage("archetype_decktype_data_downloader",
+          outputs=(DATA / "archetype_decktype_data" / "archetype_list.csv",
+                   DATA / "archetype_decktype_data" / "decktype_list.csv")),
+    # Validation needs the card list; photos already processed are skipped via the draft manifest
+    Stage("extractor_and_OCR", deps=("cubecobra_card_list_downloader",), args=("--incremental",)),
 ]
 
-TIMEOUT_SECONDS = 600 
+TIMEOUT_SECONDS = 600
+
+print_lock = threading.Lock()
+
+
+def log(name: str, message: str) -> None:
+    with print_lock:
+        print(f"[{name}] {message}")
 
 
 def run_notebook(name: str) -> None:
@@ -53,11 +89,106 @@ def run_script(name: str) -> None:
     print(f"  Done: {name}")
 
 
+def run_stage(stage: Stage) -> float:
+    """Run a stage's script with its output prefixed by the stage name; returns seconds taken."""
+    start = time.perf_counter()
+    log(stage.name, "started")
+    proc = subprocess.Popen(
+        [sys.executable, str(SCRIPTS / f"{stage.name}.py"), *stage.args],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    for line in proc.stdout:
+        log(stage.name, line.rstrip("\n"))
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, stage.name)
+    return time.perf_counter() - start
+
+
+def is_up_to_date(stage: Stage, stages: dict, max_age: float | None) -> bool:
+    """True if every output exists, is younger than max_age minutes and newer than the dependencies' outputs."""
+    if max_age is None or not stage.outputs or not all(p.exists() for p in stage.outputs):
+        return False
+    oldest = min(p.stat().st_mtime for p in stage.outputs)
+    if time.time() - oldest > max_age * 60:
+        return False
+    dep_outputs = [p for dep in stage.deps for p in stages[dep].outputs if p.exists()]
+    return all(p.stat().st_mtime <= oldest for p in dep_outputs)
+
+
+def run_stages(stages: list, max_age: float | None = None) -> dict:
+    """Run stages as soon as their dependencies finish. Returns {name: seconds, or None if skipped}."""
+    by_name = {s.name: s for s in stages}
+    pending = list(stages)
+    timings = {}
+    running = {}
+    failed  = None
+
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        while pending or running:
+            for stage in [s for s in pending if all(d in timings for d in s.deps)]:
+                pending.remove(stage)
+                if failed:
+                    log(stage.name, "not run, an earlier stage failed")
+                    continue
+                if is_up_to_date(stage, by_name, max_age):
+                    log(stage.name, "up to date, skipped")
+                    timings[stage.name] = None
+                    continue
+                running[pool.submit(run_stage, stage)] = stage
+            if not running:
+                if failed:
+                    for stage in pending:
+                        log(stage.name, "not run, an earlier stage failed")
+                elif pending:
+                    raise ValueError(f"Unresolvable stage dependencies: {[s.name for s in pending]}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    timings[stage.name] = future.result()
+                    log(stage.name, f"done in {timings[stage.name]:.1f}s")
+                except subprocess.CalledProcessError as e:
+                    log(stage.name, f"FAILED (exit code {e.returncode})")
+                    failed = failed or e
+
+    if failed:
+        raise failed
+    return timings
+
+
+def print_timings(timings: dict, total: float) -> None:
+    print(f"\n{'=' * 60}")
+    print("  Stage timings")
+    for name, seconds in timings.items():
+        print(f"    {name:<40} {'skipped' if seconds is None else f'{seconds:7.1f}s'}")
+    print(f"    {'total (wall clock)':<40} {total:7.1f}s")
+    print(f"{'=' * 60}")
+
+
 def main() -> None:
-    print("Starting draft pipeline...")
+    parser = argparse.ArgumentParser(description="Run the draft pipeline, then launch the Deck Editor.")
+    parser.add_argument("--max-age", type=float, metavar="MINUTES",
+                        help="skip stages whose outputs are younger than this and newer than their inputs")
+    parser.add_argument("--force", action="store_true",
+                        help="run every stage and re-process every photo (no --incremental)")
+    args = parser.parse_args()
 
-    for script in SCRIPTS_TO_RUN:
-        run_script(script)
+    stages = STAGES
+    if args.force:
+        stages = [s._replace(args=tuple(a for a in s.args if a != "--incremental")) for s in STAGES]
+
+    print("Starting draft pipeline...")
+    start = time.perf_counter()
+    timings = run_stages(stages, None if args.force else args.max_age)
+    print_timings(timings, time.perf_counter() - start)
 
     print(f"\n{'=' * 60}")
     print("  All scripts done. Launching Deck Editor...")
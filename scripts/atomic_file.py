@@ -0,0 +1,63 @@
+"""
+atomic_file.py
+--------------
+Crash-safe rewrites of the files the pipeline maintains (OCR / HTTP / Drive
+tree caches, manifests, metrics, player CSVs and annotated images).
+
+    with atomic_write(path) as f:          # text, UTF-8; mode='wb' for bytes
+        json.dump(data, f)
+
+Data goes to a hidden temporary file in the target's folder, which replaces
+`path` (os.replace) only when the block finishes without an exception and is
+deleted otherwise, so readers only ever see the old file or the complete new
+one. `AtomicFile` is the same without the `with` block, for writers that
+commit several files together (player_output.PlayerOutput).
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+class AtomicFile:
+    """Temporary file next to `path`: `commit()` moves it over `path`, `discard()` deletes it."""
+
+    def __init__(self, path, mode='w'):
+        self.path = path
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.', suffix='.tmp')
+        try:
+            if 'b' in mode:
+                self.file = os.fdopen(fd, mode)
+            else:
+                self.file = os.fdopen(fd, mode, newline='', encoding='utf-8')
+        except BaseException:
+            os.close(fd)
+            os.remove(self.tmp_path)
+            raise
+
+    def commit(self):
+        try:
+            self.file.close()
+            os.replace(self.tmp_path, self.path)
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    """Open `path` for writing; it is only replaced if the block succeeds."""
+    target = AtomicFile(path, mode)
+    try:
+        yield target.file
+    except BaseException:
+        target.discard()
+        raise
+    target.commit()
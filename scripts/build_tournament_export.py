@@ -15,12 +15,14 @@ Usage:
 """
 
 import glob
+import json
 import os
 import zipfile
 from io import StringIO
 
 import pandas as pd
-import requests
+
+from http_cache import HTTPCache
 
 ROOT          = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ZIP_DIR       = os.path.join(ROOT, "data", "zip")
@@ -29,18 +31,19 @@ DATA_FINAL    = os.path.join(ROOT, "data", "final")
 GITHUB_API    = "https://api.github.com/repos/DimlasZ/TournamentOrganizer-NativeReact/contents/results"
 
 
-def fetch_newest_github_matches():
-    """Return (filename, raw_csv_text) for the newest file in the GitHub results folder."""
-    resp = requests.get(GITHUB_API, timeout=30)
-    resp.raise_for_status()
-    files = sorted(resp.json(), key=lambda f: f["name"], reverse=True)
+def fetch_newest_github_matches(http=None):
+    """Return (filename, raw_csv_text, changed) for the newest file in the GitHub results folder.
+    Both requests are conditional; `changed` is False if the matches file was served from cache.
+    """
+    http = http or HTTPCache()
+    listing, _ = http.fetch_text(GITHUB_API)
+    files = sorted(json.loads(listing), key=lambda f: f["name"], reverse=True)
     if not files:
         raise FileNotFoundError("No files found in GitHub results/ folder")
     newest = files[0]
     print(f"GitHub file: {newest['name']}")
-    raw = requests.get(newest["download_url"], timeout=30)
-    raw.raise_for_status()
-    return newest["name"], raw.text
+    text, changed = http.fetch_text(newest["download_url"])
+    return newest["name"], text, changed
 
 
 def find_newest_final_csv():
@@ -53,9 +56,13 @@ def find_newest_final_csv():
     return path
 
 
-def main():
-    # ── 1. Download matches from GitHub ──────────────────────────────────────
-    gh_filename, matches_text = fetch_newest_github_matches()
+def export_zip_path(gh_filename, zip_dir=ZIP_DIR):
+    """data/zip/{date}_tournament_export.zip for a "{date}_matches.csv" file name."""
+    return os.path.join(zip_dir, f"{gh_filename.replace('_matches.csv', '')}_tournament_export.zip")
+
+
+def build_export(gh_filename, matches_text, final_path, zip_dir=ZIP_DIR):
+    """Write the export zip for one matches file + final CSV and return its path."""
     df_matches = pd.read_csv(StringIO(matches_text))
 
     # ── 2. Extract tournament date and derive date prefix ────────────────────
@@ -64,18 +71,16 @@ def main():
     tournament_date = df_matches["tournamentDate"].iloc[0]
     print(f"Tournament date: {tournament_date}  (prefix: {date_prefix})")
 
-    # ── 3. Load newest final CSV and add "tournament" column ─────────────────
-    final_path = find_newest_final_csv()
+    # ── 3. Load final CSV and add "tournament" column ────────────────────────
     df_decks = pd.read_csv(final_path)
     df_decks["tournament"] = tournament_date
 
     # ── 4. Build zip ─────────────────────────────────────────────────────────
-    zip_name    = f"{date_prefix}_tournament_export.zip"
-    zip_path    = os.path.join(ZIP_DIR, zip_name)
+    zip_path    = export_zip_path(gh_filename, zip_dir)
     decks_name  = f"{date_prefix}_drafted_decks.csv"
     matches_name = gh_filename  # already the right name
 
-    os.makedirs(ZIP_DIR, exist_ok=True)
+    os.makedirs(zip_dir, exist_ok=True)
     with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
         zf.writestr(matches_name, matches_text)
         zf.writestr(decks_name, df_decks.to_csv(index=False))
@@ -83,6 +88,21 @@ def main():
     print(f"\nCreated: {zip_path}")
     print(f"  └── {matches_name}")
     print(f"  └── {decks_name}  (+tournament column)")
+    return zip_path
+
+
+def main():
+    # ── 1. Download matches from GitHub ──────────────────────────────────────
+    gh_filename, matches_text, matches_changed = fetch_newest_github_matches()
+    final_path = find_newest_final_csv()
+
+    # Nothing to rebuild if the matches file is unchanged and the zip is newer than the final CSV
+    zip_path = export_zip_path(gh_filename)
+    if not matches_changed and os.path.exists(zip_path) and os.path.getmtime(zip_path) >= os.path.getmtime(final_path):
+        print(f"\nUp to date: {zip_path}")
+        return
+
+    build_export(gh_filename, matches_text, final_path)
 
 
 if __name__ == "__main__":
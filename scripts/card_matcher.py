@@ -0,0 +1,275 @@
+"""
+card_matcher.py
+---------------
+Prebuilt fuzzy lookup of OCR text against the cube card list.
+
+`CardMatcher.best_match(text)` returns exactly what
+`difflib.get_close_matches(text, cards, n=1, cutoff=cutoff)` would, but without
+running SequenceMatcher against the whole list for every detection.
+
+How it works:
+    A character inverted index maps (char, k) -> every card containing `char`
+    at least k times. Summing the posting lists hit by a query gives, for every
+    card at once, the size of the character multiset intersection, i.e. the
+    numerator of difflib's `quick_ratio`. Cards are stored sorted by length, so
+    each posting list is first sliced to the lengths allowed by
+    `real_quick_ratio`. Since ratio <= quick_ratio, the remaining cards are
+    scored in descending quick_ratio order and the scan stops as soon as the
+    bound drops below the best ratio found so far.
+
+`CardMatcher.variant_match(text)` is tried before best_match: every card is also stored under
+its `confusion_key`, which folds the usual OCR misreads (l / I / i / 1 / |,
+O / 0, rn / m, $ / s) and drops accents, spaces and punctuation (apostrophes,
+commas, the " // " of split cards). A detection whose key equals exactly one
+card's key is that card, found with one dict lookup instead of a fuzzy scan.
+Keys shared by several cards are left out, so a hit is never ambiguous.
+
+`CardSearchIndex.search(query)` backs the deck editor's "Add missing card"
+box: names are normalized once (lowercase, no accents or punctuation) and
+indexed by word prefix and by trigram, so each keystroke only touches the
+cards sharing a prefix or trigram with the query. Results are ranked exact >
+name prefix > word prefixes > substring; when nothing matches, cards sharing
+most of the query's trigrams are suggested, so typos and OCR-mangled names
+are still findable.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher, get_close_matches
+
+
+class CardMatcher:
+    """Index over a fixed card list, built once and queried per detection."""
+
+    def __init__(self, cards, cutoff=0.65):
+        # Sorted by length first so a length window is a contiguous index range
+        self.cards   = sorted(set(cards), key=lambda c: (len(c), c))
+        self.cutoff  = cutoff
+        self.lengths = [len(c) for c in self.cards]
+
+        postings = defaultdict(list)
+        for idx, card in enumerate(self.cards):
+            for char, count in Counter(card).items():
+                for k in range(1, count + 1):
+                    postings[(char, k)].append(idx)
+        self.postings = dict(postings)
+
+        variants = {}
+        for card in self.cards:
+            key = confusion_key(card)
+            variants[key] = None if key in variants else card   # None: ambiguous key
+        self.variants = {key: card for key, card in variants.items() if card is not None}
+
+    def __len__(self):
+        return len(self.cards)
+
+    def candidates(self, text):
+        """Return [(quick_ratio, index)] for cards that can still reach the cutoff, best first."""
+        # real_quick_ratio: 2 * min(n, L) / (n + L) >= cutoff bounds the card length L.
+        # Widened by one on each side so float rounding never drops a boundary length.
+        n_text = len(text)
+        lo = bisect_left(self.lengths, n_text * self.cutoff / (2 - self.cutoff) - 1)
+        hi = bisect_right(self.lengths, n_text * (2 - self.cutoff) / self.cutoff + 1)
+        if lo >= hi:
+            return []
+
+        overlap = Counter()
+        for char, count in Counter(text).items():
+            for k in range(1, count + 1):
+                posting = self.postings.get((char, k))
+                if posting:
+                    overlap.update(posting[bisect_left(posting, lo):bisect_left(posting, hi)])
+
+        lengths = self.lengths
+        cutoff  = self.cutoff
+        scored  = []
+        for idx, shared in overlap.items():
+            bound = 2.0 * shared / (n_text + lengths[idx])
+            if bound >= cutoff:
+                scored.append((bound, idx))
+        scored.sort(reverse=True)
+        return scored
+
+    def variant_match(self, text):
+        """Return the only card whose confusion_key equals the text's, or None."""
+        key = confusion_key(text)
+        return self.variants.get(key) if key else None
+
+    def best_match(self, text):
+        """Return the closest card name with similarity >= cutoff, or None."""
+        if self.cutoff <= 0:
+            # Every card qualifies, so the index cannot prune anything
+            matches = get_close_matches(text, self.cards, n=1, cutoff=self.cutoff)
+            return matches[0] if matches else None
+
+        # difflib compares with the query as seq2 and each card as seq1; ratio()
+        # is not symmetric, so keep the same orientation.
+        s = SequenceMatcher()
+        s.set_seq2(text)
+        best = None
+        for bound, idx in self.candidates(text):
+            if best is not None and bound < best[0]:
+                break
+            card = self.cards[idx]
+            s.set_seq1(card)
+            score = s.ratio()
+            # Ties are broken on the name itself, like get_close_matches' nlargest
+            if score >= self.cutoff and (best is None or (score, card) > best):
+                best = (score, card)
+        return best[1] if best else None
+
+    def top_matches(self, text, n=3):
+        """Up to `n` cards with similarity >= cutoff as [(ratio, card)], best first;
+        the first entry is always best_match(text).
+        """
+        if self.cutoff <= 0:
+            s = SequenceMatcher()
+            s.set_seq2(text)
+            scored = []
+            for card in get_close_matches(text, self.cards, n=n, cutoff=self.cutoff):
+                s.set_seq1(card)
+                scored.append((s.ratio(), card))
+            return scored
+
+        s = SequenceMatcher()
+        s.set_seq2(text)
+        best = []  # min-heap of the n best (score, card)
+        for bound, idx in self.candidates(text):
+            if len(best) == n and bound < best[0][0]:
+                break
+            card = self.cards[idx]
+            s.set_seq1(card)
+            score = s.ratio()
+            if score < self.cutoff:
+                continue
+            if len(best) < n:
+                heapq.heappush(best, (score, card))
+            elif (score, card) > best[0]:
+                heapq.heapreplace(best, (score, card))
+        return sorted(best, reverse=True)
+
+
+# Characters OCR mixes up, folded to one representative (applied after lowercasing)
+CONFUSABLE = str.maketrans({'i': 'l', '1': 'l', '|': 'l', '!': 'l', '0': 'o', '$': 's'})
+
+def confusion_key(text):
+    """Lookup key that survives common OCR misreads: "Kolaghans  C0mmand" and "Kolaghan's Command" -> "kolaghanscommand"."""
+    key = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    key = re.sub(r'[^a-z0-9]', '', key.translate(CONFUSABLE))
+    return key.replace('rn', 'm')
+
+def normalize_name(name):
+    """Lowercase, strip accents and punctuation, collapse whitespace: "Lim-Dûl's Vault" -> "lim dul s vault"."""
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode('ascii').lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', name))
+
+def trigrams(normalized):
+    """Trigrams of a normalized name, padded so word starts and ends count too."""
+    padded = f'  {normalized} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CardSearchIndex:
+    """Search-as-you-type index over a fixed card list, built once per card list."""
+
+    def __init__(self, names, min_fuzzy=0.5):
+        self.names     = list(dict.fromkeys(names))   # input order, for the unfiltered list
+        self.min_fuzzy = min_fuzzy
+
+        # Internal ids follow (normalized length, name), so within a tier the
+        # lowest id is the best-ranked card and top-N is a heap over ids
+        norms       = {name: normalize_name(name) for name in self.names}
+        self.cards  = sorted(self.names, key=lambda n: (len(norms[n]), n))
+        self.norms  = [norms[name] for name in self.cards]
+        self.sorted = sorted((norm, idx) for idx, norm in enumerate(self.norms))
+
+        word_prefixes = defaultdict(set)
+        grams         = defaultdict(set)
+        self.card_grams = []
+        for idx, norm in enumerate(self.norms):
+            for word in norm.split():
+                for k in range(1, len(word) + 1):
+                    word_prefixes[word[:k]].add(idx)
+            card_grams = frozenset(trigrams(norm))
+            self.card_grams.append(card_grams)
+            for gram in card_grams:
+                grams[gram].add(idx)
+        self.word_prefixes = {prefix: frozenset(ids) for prefix, ids in word_prefixes.items()}
+        self.grams         = {gram: frozenset(ids) for gram, ids in grams.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _intersect(sets):
+        sets = sorted(sets, key=len)
+        if not sets or not sets[0]:
+            return set()
+        return set(sets[0]).intersection(*sets[1:])
+
+    def _prefix_matches(self, query):
+        """Ids of cards whose normalized name starts with `query` (exact match included)."""
+        lo = bisect_left(self.sorted, (query,))
+        hi = bisect_left(self.sorted, (query + '\x7f',))
+        return [idx for _, idx in self.sorted[lo:hi]]
+
+    def _fuzzy_matches(self, query):
+        """[(score, id)] of cards sharing at least `min_fuzzy` of the query's trigrams."""
+        query_grams = trigrams(query)
+        needed      = max(1, int(len(query_grams) * self.min_fuzzy + 0.999))
+        # A card sharing `needed` trigrams must appear in one of the
+        # len - needed + 1 rarest posting lists, so only those are scanned
+        postings   = sorted((self.grams.get(g, frozenset()) for g in query_grams), key=len)
+        candidates = set().union(*postings[:len(query_grams) - needed + 1])
+        scored = []
+        for idx in candidates:
+            shared = len(query_grams & self.card_grams[idx])
+            if shared >= needed:
+                coverage = shared / len(query_grams)
+                dice     = 2.0 * shared / (len(query_grams) + len(self.card_grams[idx]))
+                scored.append((-(coverage + dice), idx))
+        scored.sort()
+        return [idx for _, idx in scored]
+
+    def search(self, query, limit=50, exclude=()):
+        """Best `limit` card names for `query`, skipping names in `exclude`.
+
+        Ranked exact > name prefix > every query word starts a word of the name >
+        substring; ties go to the shorter name, then alphabetically. Only if none
+        of these match are fuzzy (trigram) suggestions returned instead.
+        """
+        query = normalize_name(query)
+        if not query:
+            return []
+        take    = limit + len(exclude)
+        results = []
+        seen    = set()
+
+        def add(ids):
+            for idx in ids:
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                if self.cards[idx] not in exclude:
+                    results.append(self.cards[idx])
+                    if len(results) == limit:
+                        return True
+            return False
+
+        if add(heapq.nsmallest(take, self._prefix_matches(query))):
+            return results
+        words = self._intersect(self.word_prefixes.get(w, frozenset()) for w in query.split())
+        if add(heapq.nsmallest(take + len(seen), words)):
+            return results
+        if len(query) >= 3:
+            inner = {query[i:i + 3] for i in range(len(query) - 2)}
+            hits  = self._intersect(self.grams.get(g, frozenset()) for g in inner)
+            if add(heapq.nsmallest(take + len(seen), (i for i in hits if query in self.norms[i]))):
+                return results
+            # Fuzzy suggestions only when nothing contains the query (a typo or OCR garbage)
+            if not seen:
+                add(self._fuzzy_matches(query))
+        return results
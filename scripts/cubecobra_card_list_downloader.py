@@ -4,31 +4,44 @@
 #
 # What it does:
 #   1. Fetches the cube CSV export from CubeCobra using the cube ID
+#      (conditional request; stops early if the cube and its Scryfall IDs are unchanged)
 #   2. Parses card names, set codes, and collector numbers
 #   3. Saves them alphabetically to a local CSV file ({CUBE_ID}_cardlist.csv)
-#   4. Enriches with Scryfall IDs using set + collector number
+#   4. Enriches with Scryfall IDs using set + collector number, or the card name for
+#      printings Scryfall doesn't know (IDs already in data/cache/scryfall_ids.sqlite,
+#      by printing or by name, are not fetched again)
 
-import requests
 import csv
 import io
 import os
 import sys
 import time
 
+from http_cache import HTTPCache
+from scryfall_client import ScryfallClient, ScryfallIDCache, SCRYFALL_API
+
 # Project root is one level up from this scripts/ folder
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CARDLIST_DIR = os.path.join(PROJECT_ROOT, 'data', 'cardlist')
+SCRYFALL_ID_CACHE = os.path.join(PROJECT_ROOT, 'data', 'cache', 'scryfall_ids.sqlite')
 
 CUBE_ID = "dimlas5"
 CSV_URL = f"https://cubecobra.com/cube/download/csv/{CUBE_ID}"
 
 print(f"Downloading from: {CSV_URL}")
 
-response = requests.get(CSV_URL)
-response.raise_for_status()
+# Conditional GET: CubeCobra answers 304 if the cube has not changed since the last run
+csv_text, changed = HTTPCache().fetch_text(CSV_URL)
+
+output_file = os.path.join(CARDLIST_DIR, f"{CUBE_ID}_cardlist.csv")
+if not changed and os.path.exists(output_file):
+    with open(output_file, 'r', encoding='utf-8', newline='') as f:
+        if all(row['scryfall_id'] for row in csv.DictReader(f)):
+            print(f"Cube unchanged since last download — {output_file} is up to date")
+            sys.exit(0)
 
 # Parse CSV and extract card data
-csv_data = csv.DictReader(io.StringIO(response.text))
+csv_data = csv.DictReader(io.StringIO(csv_text))
 cards = []
 
 for row in csv_data:
@@ -42,7 +55,6 @@ print(f"Downloaded {len(cards)} cards")
 
 # Save to CSV file (sorted by name)
 os.makedirs(CARDLIST_DIR, exist_ok=True)
-output_file = os.path.join(CARDLIST_DIR, f"{CUBE_ID}_cardlist.csv")
 cards.sort(key=lambda c: c['name'])
 
 with open(output_file, 'w', newline='', encoding='utf-8') as f:
@@ -57,10 +69,9 @@ print(f"Saved {len(cards)} cards to {output_file}")
 # --- Scryfall ID Enrichment ---
 # Uses set code + collector number from CubeCobra to get the EXACT scryfall ID
 # for the specific printing in your cube (not a random printing).
-# Batch lookup via /cards/collection (75 per request), with retry on failure.
-
-MAX_RETRIES = 3
-BATCH_SIZE  = 75
+# Batch lookup via /cards/collection (75 per request), sent concurrently under
+# Scryfall's rate limit with backoff + jitter (see scryfall_client.py).
+# Set SCRYFALL_API to point at a local stub server for testing.
 
 # Load card data from the saved CSV
 cards = []
@@ -76,9 +87,14 @@ with open(output_file, 'r', encoding='utf-8', newline='') as f:
 
 print(f"Loaded {len(cards)} cards from {output_file}")
 
+# Only printings missing from the local ID cache go to Scryfall
+id_cache = ScryfallIDCache(SCRYFALL_ID_CACHE)
+
 # Build batch identifiers using set + collector_number
 identifiers = []
 for card in cards:
+    if id_cache.lookup(card):
+        continue
     if card['set'] and card['collector_number']:
         identifiers.append({
             'set': card['set'],
@@ -87,52 +103,35 @@ for card in cards:
     else:
         identifiers.append({'name': card['name']})
 
-batches = [identifiers[i:i + BATCH_SIZE] for i in range(0, len(identifiers), BATCH_SIZE)]
-print(f"Fetching scryfall IDs in {len(batches)} batches...\n")
-
-# set/collector_number -> scryfall_id
-scryfall_map = {}
-
-for i, batch in enumerate(batches, 1):
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            resp = requests.post(
-                "https://api.scryfall.com/cards/collection",
-                json={"identifiers": batch},
-                timeout=30
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            for card in data.get("data", []):
-                key = f"{card['set']}|{card['collector_number']}"
-                scryfall_map[key] = card["id"]
-                # Also store by name (front face) as fallback key
-                front_name = card["name"].split(" // ")[0].strip()
-                scryfall_map[f"name|{front_name}"] = card["id"]
-                scryfall_map[f"name|{card['name']}"] = card["id"]
-
-            print(f"  Batch {i}/{len(batches)} done ({len([v for k,v in scryfall_map.items() if not k.startswith('name|')])} found so far)")
-            time.sleep(0.1)
-            break
-        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-            if attempt < MAX_RETRIES:
-                wait = attempt * 5
-                print(f"  Batch {i} attempt {attempt} failed — retrying in {wait}s...")
-                time.sleep(wait)
-            else:
-                print(f"  Batch {i} FAILED after {MAX_RETRIES} attempts: {e}")
-
-# Match results back to cards
+print(f"{len(cards) - len(identifiers)} scryfall IDs already cached in {SCRYFALL_ID_CACHE}")
+
+if identifiers:
+    print(f"Fetching scryfall IDs for {len(identifiers)} identifiers from {SCRYFALL_API}...\n")
+
+    start = time.perf_counter()
+    with ScryfallClient() as client:
+        found, not_found, failed = client.fetch_collection(identifiers)
+        # Printings Scryfall doesn't know (e.g. a wrong collector number) get one more try by name
+        misses = {(i['set'], i['collector_number']) for i in not_found if 'set' in i}
+        names  = sorted({c['name'] for c in cards if (c['set'], c['collector_number']) in misses})
+        if names:
+            print(f"  {len(names)} printing(s) not found by set/collector number, retrying by name")
+            by_name, _, failed_by_name = client.fetch_collection([{'name': name} for name in names])
+            found  += by_name
+            failed += failed_by_name
+    print(f"  Scryfall lookup took {time.perf_counter() - start:.1f}s")
+    if failed:
+        print(f"  {len(failed)} identifier(s) could not be fetched after retries")
+
+    # Remember set|collector_number and name (front face too) -> scryfall_id
+    id_cache.add(found)
+
+# Match results back to cards, by printing or else by name
 for card in cards:
-    key = f"{card['set']}|{card['collector_number']}"
-    if key in scryfall_map:
-        card['scryfall_id'] = scryfall_map[key]
-    else:
-        # Fallback: try by name
-        name_key = f"name|{card['name']}"
-        if name_key in scryfall_map:
-            card['scryfall_id'] = scryfall_map[name_key]
+    if id_cache.lookup(card):
+        card['scryfall_id'] = id_cache.lookup(card)
+
+id_cache.close()
 
 # Write enriched CSV
 with open(output_file, 'w', newline='', encoding='utf-8') as f:
@@ -4,6 +4,9 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 
+from card_matcher import CardSearchIndex
+from draft_store import STORE_DIR, DraftStore, find_draft_store
+
 ROOT = Path(__file__).parent.parent
 CLEAN_DIR = ROOT / "data" / "clean"
 CARD_LIST_PATH = ROOT / "data" / "cardlist" / "dimlas5_cardlist.csv"
@@ -11,27 +14,94 @@ ARCHETYPE_LIST_PATH = ROOT / "data" / "archetype_decktype_data" / "archetype_lis
 DECKTYPE_LIST_PATH = ROOT / "data" / "archetype_decktype_data" / "decktype_list.csv"
 OUTPUT_DIR = ROOT / "data" / "final"
 EMPTY = "—"
+SEARCH_LIMIT = 50
+
+
+# ── Cached data layer ────────────────────────────────────────────────────────
+# Every file/folder read is cached under its path plus (mtime, size), so Streamlit
+# reruns reuse the parsed data and any change on disk (a save, a new extractor run,
+# a fresh downloader run) is picked up on the next rerun.
+
+def file_signature(path):
+    """(mtime_ns, size) of a file or folder, or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_data(max_entries=256)
+def _read_csv(path, signature):
+    return pd.read_csv(path)
+
+
+def read_csv(path):
+    """pd.read_csv(path), reparsed only when the file changed."""
+    return _read_csv(str(path), file_signature(path))
+
+
+@st.cache_data(max_entries=64)
+def _list_dir(path, signature, pattern):
+    return sorted(p.name for p in Path(path).glob(pattern))
+
+
+def list_dir(path, pattern="*"):
+    """Sorted names in a folder matching `pattern`, relisted only when the folder changed."""
+    return _list_dir(str(path), file_signature(path), pattern)
+
+
+@st.cache_resource(max_entries=4)
+def _card_search(path, signature):
+    df = pd.read_csv(path).fillna({"scryfall_id": ""})
+    return CardSearchIndex(df["name"]), dict(zip(df["name"], df["scryfall_id"]))
+
+
+def card_search():
+    """(CardSearchIndex over the cube, {name: scryfall_id}), rebuilt only when the card list changes."""
+    return _card_search(str(CARD_LIST_PATH), file_signature(CARD_LIST_PATH))
 
 
-@st.cache_data
-def load_cube():
-    df = pd.read_csv(CARD_LIST_PATH)
-    return df[["name", "scryfall_id"]]
+@st.cache_data(max_entries=16)
+def _store_path(draft, signatures):
+    store = find_draft_store(draft)
+    return store.path if store else None
+
+
+@st.cache_data(max_entries=16)
+def _store_draft(path, signature, draft):
+    store = DraftStore(path)
+    return {
+        "cards": {player: store.clean_cards(draft, player) for player in store.players(draft)},
+        "decks": store.saved_decks(draft),
+    }
+
+
+def store_path(draft):
+    """Path of the season store holding the draft, or None (drafts extracted before the store existed)."""
+    signatures = tuple((p.name, file_signature(p)) for p in sorted(Path(STORE_DIR).glob("*.sqlite")))
+    return _store_path(draft, signatures)
+
+
+def load_store_draft(draft):
+    """{"cards": {player: [cards]}, "decks": {player: (archetype, decktype)}} from the season store,
+    requeried only when the store file changed; None if the draft is not in a store."""
+    path = store_path(draft)
+    return _store_draft(path, file_signature(Path(path)), draft) if path else None
 
 
-@st.cache_data
 def load_archetypes():
-    df = pd.read_csv(ARCHETYPE_LIST_PATH)
+    df = read_csv(ARCHETYPE_LIST_PATH)
     return df["archetype"].dropna().tolist()
 
 
 def load_decktypes():
-    df = pd.read_csv(DECKTYPE_LIST_PATH)
+    df = read_csv(DECKTYPE_LIST_PATH)
     return df["decktype"].dropna().tolist()
 
 
 def save_decktype(name):
-    df = pd.read_csv(DECKTYPE_LIST_PATH)
+    df = read_csv(DECKTYPE_LIST_PATH)
     new_row = pd.DataFrame({"decktype": [name]})
     df = pd.concat([df, new_row], ignore_index=True)
     df.to_csv(DECKTYPE_LIST_PATH, index=False)
@@ -40,19 +110,30 @@ def save_decktype(name):
 def get_draft_folders():
     if not CLEAN_DIR.exists():
         return []
-    return sorted([d.name for d in CLEAN_DIR.iterdir() if d.is_dir()])
+    return [name for name in list_dir(CLEAN_DIR) if (CLEAN_DIR / name).is_dir()]
 
 
 def get_players(draft_folder):
-    folder = CLEAN_DIR / draft_folder
-    csvs = list(folder.glob("clean_*.csv"))
-    return sorted([f.stem.replace("clean_", "", 1) for f in csvs])
+    csvs = list_dir(CLEAN_DIR / draft_folder, "clean_*.csv")
+    return sorted(Path(f).stem.replace("clean_", "", 1) for f in csvs)
 
 
 def load_player_cards(draft_folder, player):
+    stored = load_store_draft(draft_folder)
+    if stored and player in stored["cards"]:
+        return [dict(card) for card in stored["cards"][player]]
     path = CLEAN_DIR / draft_folder / f"clean_{player}.csv"
-    df = pd.read_csv(path)
-    return df[["name", "scryfall_id"]].to_dict("records")
+    df = read_csv(path)
+    # Cards without a Scryfall ID come back as NaN, which the store's NOT NULL scryfall_id rejects
+    return df[["name", "scryfall_id"]].fillna({"scryfall_id": ""}).to_dict("records")
+
+
+def load_final(draft_folder):
+    """The draft's data/final CSV as a DataFrame, or None if nothing was saved yet."""
+    out_path = OUTPUT_DIR / f"{draft_folder}.csv"
+    if not out_path.exists():
+        return None
+    return read_csv(out_path)
 
 
 def get_annotated_image_path(draft_folder, player):
@@ -77,10 +158,12 @@ def init_player_state(draft_folder, player):
 
 
 def load_saved_state(draft_folder, player):
-    out_path = OUTPUT_DIR / f"{draft_folder}.csv"
-    if not out_path.exists():
+    stored = load_store_draft(draft_folder)
+    if stored and player in stored["decks"]:
+        return stored["decks"][player]
+    df = load_final(draft_folder)
+    if df is None:
         return None, None
-    df = pd.read_csv(out_path)
     row = df[df["player"] == player]
     if row.empty:
         return None, None
@@ -114,14 +197,20 @@ def do_save(state, player, draft):
     ]
     new_df = pd.DataFrame(rows)
 
-    if out_path.exists():
-        existing = pd.read_csv(out_path)
+    existing = load_final(draft)
+    if existing is not None:
         existing = existing[existing["player"] != player]
         combined = pd.concat([existing, new_df], ignore_index=True)
     else:
         combined = new_df
 
     combined.to_csv(out_path, index=False)
+
+    # Keep the season store (if the extractor created one for this draft) in sync with the CSV
+    path = store_path(draft)
+    if path:
+        DraftStore(path).write_deck(draft, player, archetype, decktype, [card["scryfall_id"] for card in state["cards"]])
+
     st.toast(f"Saved {len(rows)} cards for {player}.", icon="✅")
     st.rerun()
 
@@ -149,10 +238,8 @@ with st.sidebar:
         st.error("No players found in this draft.")
         st.stop()
 
-    out_path = OUTPUT_DIR / f"{draft}.csv"
-    saved_players = []
-    if out_path.exists():
-        saved_players = pd.read_csv(out_path)["player"].unique().tolist()
+    final_df = load_final(draft)
+    saved_players = [] if final_df is None else final_df["player"].unique().tolist()
 
     player = st.radio(
         "Player",
@@ -249,18 +336,19 @@ with edit_col:
     # ── Add card ──
     st.subheader("Add missing card")
 
-    cube = load_cube()
-    existing_ids = {c["scryfall_id"] for c in state["cards"]}
-    available = cube[~cube["scryfall_id"].isin(existing_ids)]
+    search_index, scryfall_ids = card_search()
+    existing = {c["name"] for c in state["cards"]}
 
     search = st.text_input("Search card name", key="card_search")
-    filtered = available[available["name"].str.contains(search, case=False, na=False)] if search else available
+    if search:
+        matches = search_index.search(search, limit=SEARCH_LIMIT, exclude=existing)
+    else:
+        matches = [name for name in search_index.names if name not in existing]
 
-    if not filtered.empty:
-        selected_card = st.selectbox("Select card to add", filtered["name"].tolist(), key="card_select")
+    if matches:
+        selected_card = st.selectbox("Select card to add", matches, key="card_select")
         if st.button("Add card"):
-            row = filtered[filtered["name"] == selected_card].iloc[0]
-            state["cards"].append({"name": row["name"], "scryfall_id": row["scryfall_id"]})
+            state["cards"].append({"name": selected_card, "scryfall_id": scryfall_ids[selected_card]})
             st.rerun()
     else:
         st.info("No cards match your search.")
@@ -0,0 +1,155 @@
+"""
+deck_matcher.py
+---------------
+Matches all detections of one photo against the cube at once.
+
+validate_card() resolves detections one by one, top to bottom, so an early
+fuzzy hit can take a card that a later, better detection needed: the later
+one then becomes a `duplicate` and the card it really was is lost. Here every
+detection is scored first, then cards are handed out with an optimal
+one-to-one assignment (maximum total similarity):
+
+    1. candidates   an exact (case-insensitive) hit is a detection's only
+                    candidate, scored 1.0, and an OCR-confusion variant
+                    (CardMatcher.variant_match) likewise, scored VARIANT_SCORE;
+                    otherwise CardMatcher.top_matches()
+                    gives up to CANDIDATES cards with their difflib ratio,
+                    keeping only those within ALTERNATIVE_MARGIN of the best
+                    (so a second read of the same card stays a duplicate rather
+                    than grabbing some other similar name)
+    2. assignment   detections sharing candidate cards form small independent
+                    groups; each is solved with the Hungarian algorithm, every
+                    detection having a zero-score "no card" option. Equal
+                    totals go to the earlier detection, like validate_card.
+    3. status       assigned -> exact / exact_corrected / fuzzy; left without a
+                    card although it had candidates -> duplicate (of its best
+                    candidate); no candidates -> unmatched
+
+Without conflicts the result is exactly validate_card()'s.
+"""
+
+CANDIDATES         = 3
+ALTERNATIVE_MARGIN = 0.1
+VARIANT_SCORE      = 0.99    # an OCR-confusion variant ranks just below an exact hit
+ORDER_EPSILON      = 1e-9    # per detection index: earlier detections win ties
+FORBIDDEN          = 1e9     # cost of a detection/card pair that is not a candidate
+
+
+def linear_assignment(cost):
+    """Minimum-cost assignment of each row to a distinct column (rows <= columns).
+
+    Hungarian algorithm with potentials, O(rows^2 * columns). Returns the
+    column index of every row.
+    """
+    n, m = len(cost), len(cost[0])
+    u, v = [0.0] * (n + 1), [0.0] * (m + 1)
+    p, way = [0] * (m + 1), [0] * (m + 1)   # p[j]: row (1-based) holding column j
+    for i in range(1, n + 1):
+        p[0] = i
+        j0   = 0
+        minv = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = p[j0], float('inf'), 0
+            row = cost[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced = row[j - 1] - u[i0] - v[j]
+                    if reduced < minv[j]:
+                        minv[j], way[j] = reduced, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j]    -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1    = way[j0]
+            p[j0] = p[j1]
+            j0    = j1
+
+    assignment = [None] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            assignment[p[j] - 1] = j - 1
+    return assignment
+
+
+def detection_candidates(text, cards_lower, matcher):
+    """[(score, card)] a detection may be assigned, best first."""
+    exact = cards_lower.get(text.lower())
+    if exact:
+        return [(1.0, exact)]
+    variant = matcher.variant_match(text)
+    if variant:
+        return [(VARIANT_SCORE, variant)]
+    scored = matcher.top_matches(text, CANDIDATES)
+    return [(score, card) for score, card in scored if score >= scored[0][0] - ALTERNATIVE_MARGIN]
+
+
+def connected_groups(candidates):
+    """Detection indices grouped by shared candidate cards (union-find)."""
+    parent = list(range(len(candidates)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner = {}
+    for i, cands in enumerate(candidates):
+        for _, card in cands:
+            if card in owner:
+                parent[find(i)] = find(owner[card])
+            else:
+                owner[card] = i
+    groups = {}
+    for i, cands in enumerate(candidates):
+        if cands:
+            groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def assign_group(group, candidates):
+    """{detection index: card} for one group, maximising the total score."""
+    if len(group) == 1:
+        i = group[0]
+        return {i: candidates[i][0][1]}
+
+    cards  = sorted({card for i in group for _, card in candidates[i]})
+    column = {card: j for j, card in enumerate(cards)}
+    # Columns: the group's cards, then one "no card" column per detection
+    cost = []
+    for r, i in enumerate(group):
+        row = [FORBIDDEN] * (len(cards) + len(group))
+        for score, card in candidates[i]:
+            row[column[card]] = -score + ORDER_EPSILON * i
+        row[len(cards) + r] = 0.0
+        cost.append(row)
+    return {i: cards[j] for i, j in zip(group, linear_assignment(cost)) if j < len(cards)}
+
+
+def match_deck(texts, cards_lower, matcher):
+    """[(status, official_name)] for every detection text of one photo, like validate_card() but jointly."""
+    candidates = [detection_candidates(text, cards_lower, matcher) for text in texts]
+    assigned = {}
+    for group in connected_groups(candidates):
+        assigned.update(assign_group(group, candidates))
+
+    results = []
+    for i, text in enumerate(texts):
+        card = assigned.get(i)
+        if card is None:
+            results.append(('duplicate', candidates[i][0][1]) if candidates[i] else ('unmatched', None))
+        elif card == cards_lower.get(text.lower()):
+            results.append(('exact' if text == card else 'exact_corrected', card))
+        else:
+            results.append(('fuzzy', card))
+    return results
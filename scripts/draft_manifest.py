@@ -0,0 +1,115 @@
+"""
+draft_manifest.py
+-----------------
+Per-draft record of which player photos have already been processed.
+
+Stored as data/drafted_decks/{draft}/manifest.json:
+
+    {"files": {"<drive file id>": {"name": "Andrin.jpg",
+                                   "modifiedTime": "2026-03-01T21:14:03.000Z",
+                                   "md5Checksum": "9b2c..."}}}
+
+A photo is up to date when its id, name, modifiedTime, md5Checksum and size
+all match the recorded entry, so incremental runs only download and OCR new or
+replaced photos. Drive reports md5Checksum; local photos are compared on
+modifiedTime and size instead, so checking them never reads the file.
+
+Validation depends on the card list, so the manifest also keeps the MD5 of the
+card list its entries were validated against ("card_list_md5"). When the card
+list's content changes every entry is dropped; a rewrite with the same content
+(the CubeCobra downloader rewrites the file on most runs) changes nothing.
+
+`extractor_and_OCR.py --backfill` keeps a second file of the same shape per
+draft, backfill.json, holding only what the current backfill run has
+processed, plus the run id and, once every scheduled photo is done, a
+`completed_at` marker; `--resume` uses it to pick up where the run stopped.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from atomic_file import atomic_write
+from image_sources import file_md5
+
+MANIFEST_NAME = 'manifest.json'
+BACKFILL_NAME = 'backfill.json'
+TRACKED_FIELDS = ('name', 'modifiedTime', 'md5Checksum', 'size')
+
+
+class DraftManifest:
+    """Load, query and atomically rewrite one draft's manifest.json."""
+
+    def __init__(self, draft_dir, name=MANIFEST_NAME):
+        self.path  = os.path.join(draft_dir, name)
+        self.files = {}
+        self.meta  = {}   # other top-level keys, kept as they are
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.files = data.pop('files', {})
+            self.meta  = data
+
+    def is_current(self, file):
+        """True if this Drive file was already processed in exactly this version."""
+        entry = self.files.get(file['id'])
+        return entry is not None and all(entry.get(k) == file.get(k) for k in TRACKED_FIELDS)
+
+    def bind_card_list(self, path):
+        """Tie the entries to the card list at `path`; drops them all and returns False if
+        they were validated against a different one. Manifests written before the MD5 was
+        kept fall back to comparing modification times."""
+        digest = file_md5(path)
+        if 'card_list_md5' in self.meta:
+            changed = self.meta['card_list_md5'] != digest
+        else:
+            changed = bool(self.files) and os.path.getmtime(path) > os.path.getmtime(self.path)
+        self.meta['card_list_md5'] = digest
+        if changed:
+            self.files = {}
+        return not changed
+
+    def record(self, file):
+        """Mark a file as processed and persist the manifest."""
+        with self._lock:
+            self.files[file['id']] = {k: file.get(k) for k in TRACKED_FIELDS}
+            self._save()
+
+    def _save(self):
+        with atomic_write(self.path) as f:
+            json.dump({**self.meta, 'files': self.files}, f, indent=2, ensure_ascii=False)
+
+
+class BackfillProgress(DraftManifest):
+    """What one backfill run has done in a draft; entries of any other run are dropped."""
+
+    def __init__(self, draft_dir, run_id):
+        super().__init__(draft_dir, BACKFILL_NAME)
+        if self.meta.get('run') != run_id:
+            self.files = {}
+            self.meta  = {'run': run_id}
+        self.pending = set()
+
+    @property
+    def complete(self):
+        return 'completed_at' in self.meta
+
+    def expect(self, files):
+        """The photos this run still has to process; marks the draft complete right away if there are none."""
+        self.pending = {f['id'] for f in files}
+        if not self.pending:
+            self._complete()
+
+    def record(self, file):
+        with self._lock:
+            self.pending.discard(file['id'])
+            if not self.pending:
+                self.meta['completed_at'] = datetime.now().isoformat(timespec='seconds')
+        super().record(file)
+
+    def _complete(self):
+        with self._lock:
+            self.meta['completed_at'] = datetime.now().isoformat(timespec='seconds')
+            self._save()
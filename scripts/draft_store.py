@@ -0,0 +1,234 @@
+"""
+draft_store.py
+--------------
+One SQLite file per season holding every draft's OCR results and reviewed
+decks, next to (not instead of) the per-player CSVs.
+
+    data/store/{Season N}.sqlite
+        detections  draft, player, position, status, ocr_input, official_name, scryfall_id
+                    ← written by extractor_and_OCR.py, one row per merged detection
+        decks       draft, player, position, archetype, decktype, quantity, scryfall_id
+                    ← written by deck_editor.py on save
+
+Both tables are keyed by (draft, player, position) and indexed on player and
+scryfall_id, so loading one player, one draft, or a card across a whole
+season is a single indexed query instead of a folder of CSVs. deck_editor.py
+loads players' cards and saved decks from here, falling back to the CSVs only
+for drafts (or players) the store doesn't hold. Runs with --no-store drop the
+players they re-extract, so the store never serves detections older than
+their CSVs.
+
+CSV remains the exchange format:
+    python scripts/draft_store.py export "Season 5" 20260301_Draft_9 [out.csv]   # data/final-style CSV
+    python scripts/draft_store.py import "Season 5" 20260301_Draft_9             # load existing CSVs
+"""
+
+import argparse
+import csv
+import glob
+import os
+import sqlite3
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_DIR    = os.path.join(PROJECT_ROOT, 'data', 'store')
+CLEAN_DIR    = os.path.join(PROJECT_ROOT, 'data', 'clean')
+DRAFTED_DIR  = os.path.join(PROJECT_ROOT, 'data', 'drafted_decks')
+FINAL_DIR    = os.path.join(PROJECT_ROOT, 'data', 'final')
+
+MATCHED_STATUSES = ('exact', 'exact_corrected', 'fuzzy')
+FINAL_COLUMNS    = ['archetype', 'decktype', 'player', 'quantity', 'scryfallId']
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS detections (
+    draft         TEXT    NOT NULL,
+    player        TEXT    NOT NULL,
+    position      INTEGER NOT NULL,
+    status        TEXT    NOT NULL,
+    ocr_input     TEXT    NOT NULL,
+    official_name TEXT,
+    scryfall_id   TEXT,
+    PRIMARY KEY (draft, player, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS detections_player   ON detections (player);
+CREATE INDEX IF NOT EXISTS detections_scryfall ON detections (scryfall_id);
+
+CREATE TABLE IF NOT EXISTS decks (
+    draft       TEXT    NOT NULL,
+    player      TEXT    NOT NULL,
+    position    INTEGER NOT NULL,
+    archetype   TEXT,
+    decktype    TEXT,
+    quantity    INTEGER NOT NULL,
+    scryfall_id TEXT    NOT NULL,
+    PRIMARY KEY (draft, player, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS decks_player   ON decks (player);
+CREATE INDEX IF NOT EXISTS decks_scryfall ON decks (scryfall_id);
+'''
+
+
+def season_store_path(season):
+    return os.path.join(STORE_DIR, f'{season}.sqlite')
+
+def find_draft_store(draft):
+    """The season store that already holds `draft`, or None."""
+    for path in sorted(glob.glob(os.path.join(STORE_DIR, '*.sqlite')), reverse=True):
+        store = DraftStore(path)
+        if store.has_draft(draft):
+            return store
+    return None
+
+
+class DraftStore:
+    """Per-season SQLite store. Every call uses its own short-lived connection, so it is safe from any thread."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    # --- Writes ---
+    def write_detections(self, draft, player, cards, scryfall_ids):
+        """Replace a player's detections with validated merged cards ({'text', 'status', 'official_name'})."""
+        rows = [(draft, player, i, c['status'], c['text'], c['official_name'],
+                 scryfall_ids.get(c['official_name']) if c['official_name'] else None)
+                for i, c in enumerate(cards)]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM detections WHERE draft = ? AND player = ?', (draft, player))
+                conn.executemany('INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        finally:
+            conn.close()
+
+    def forget_detections(self, draft, players):
+        """Drop players' detections, e.g. before re-extracting them without the store."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany('DELETE FROM detections WHERE draft = ? AND player = ?', [(draft, p) for p in players])
+        finally:
+            conn.close()
+
+    def write_deck(self, draft, player, archetype, decktype, scryfall_ids):
+        """Replace a player's reviewed deck. Missing IDs (None / NaN from pandas) are stored as ''."""
+        rows = [(draft, player, i, archetype, decktype, 1, sid if isinstance(sid, str) else '')
+                for i, sid in enumerate(scryfall_ids)]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM decks WHERE draft = ? AND player = ?', (draft, player))
+                conn.executemany('INSERT INTO decks VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        finally:
+            conn.close()
+
+    # --- Reads ---
+    def drafts(self):
+        return [r[0] for r in self._query('SELECT draft FROM detections UNION SELECT draft FROM decks ORDER BY 1')]
+
+    def has_draft(self, draft):
+        return bool(self._query('SELECT 1 FROM detections WHERE draft = ? UNION ALL '
+                                'SELECT 1 FROM decks WHERE draft = ? LIMIT 1', (draft, draft)))
+
+    def players(self, draft):
+        return [r[0] for r in self._query('SELECT DISTINCT player FROM detections WHERE draft = ? ORDER BY player', (draft,))]
+
+    def clean_cards(self, draft, player):
+        """Matched cards of a player in OCR order, like clean_{player}.csv."""
+        rows = self._query(
+            f'SELECT official_name, scryfall_id FROM detections WHERE draft = ? AND player = ? '
+            f'AND status IN ({",".join("?" * len(MATCHED_STATUSES))}) ORDER BY position',
+            (draft, player, *MATCHED_STATUSES))
+        return [{'name': r['official_name'], 'scryfall_id': r['scryfall_id'] or ''} for r in rows]
+
+    def saved_decks(self, draft):
+        """{player: (archetype, decktype)} for every reviewed deck of the draft."""
+        return {r['player']: (r['archetype'], r['decktype']) for r in self._query(
+            'SELECT player, archetype, decktype FROM decks WHERE draft = ? AND position = 0', (draft,))}
+
+    def final_rows(self, draft):
+        """The draft's reviewed decks as data/final/{draft}.csv rows."""
+        return [dict(zip(FINAL_COLUMNS, tuple(r))) for r in self._query(
+            'SELECT archetype, decktype, player, quantity, scryfall_id FROM decks WHERE draft = ? '
+            'ORDER BY player, position', (draft,))]
+
+    def pick_counts(self):
+        """{scryfall_id: number of reviewed decks in the season containing it}."""
+        return {r[0]: r[1] for r in self._query(
+            'SELECT scryfall_id, COUNT(DISTINCT draft || char(0) || player) FROM decks GROUP BY scryfall_id')}
+
+    # --- CSV ---
+    def export_final_csv(self, draft, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FINAL_COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.final_rows(draft))
+
+    def import_csvs(self, draft):
+        """Load a draft's existing detailed / clean / final CSVs into the store."""
+        scryfall_ids = {}
+        for path in glob.glob(os.path.join(CLEAN_DIR, draft, 'clean_*.csv')):
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                scryfall_ids.update((r['name'], r['scryfall_id']) for r in csv.DictReader(f))
+
+        # Detailed CSVs collapse exact / exact_corrected and fuzzy -> corrected; map them back
+        status_map = {'exact': 'exact', 'corrected': 'fuzzy', 'unmatched': 'unmatched', 'duplicate': 'duplicate'}
+        for path in sorted(glob.glob(os.path.join(DRAFTED_DIR, draft, 'detailed OCR', 'detailed_*.csv'))):
+            player = os.path.basename(path)[len('detailed_'):-len('.csv')]
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                cards = [{'text': r['ocr_input'], 'status': status_map[r['status']], 'official_name': r['official_name'] or None}
+                         for r in csv.DictReader(f)]
+            self.write_detections(draft, player, cards, scryfall_ids)
+
+        final_path = os.path.join(FINAL_DIR, f'{draft}.csv')
+        if os.path.exists(final_path):
+            decks = {}
+            with open(final_path, 'r', encoding='utf-8', newline='') as f:
+                for r in csv.DictReader(f):
+                    deck = decks.setdefault(r['player'], (r['archetype'], r['decktype'], []))
+                    deck[2].extend([r['scryfallId']] * int(r['quantity'] or 1))
+            for player, (archetype, decktype, ids) in decks.items():
+                self.write_deck(draft, player, archetype, decktype, ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import drafts into / export decks from a season store.')
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('import', help='load existing CSVs of one or more drafts')
+    imp.add_argument('season')
+    imp.add_argument('drafts', nargs='+')
+    exp = sub.add_parser('export', help='write a data/final-style CSV of the reviewed decks')
+    exp.add_argument('season')
+    exp.add_argument('draft')
+    exp.add_argument('output', nargs='?')
+    args = parser.parse_args()
+
+    store = DraftStore(season_store_path(args.season))
+    if args.command == 'import':
+        for draft in args.drafts:
+            store.import_csvs(draft)
+            print(f'Imported {draft}: {len(store.players(draft))} player(s), {len(store.saved_decks(draft))} reviewed deck(s)')
+    else:
+        output = args.output or os.path.join(FINAL_DIR, f'{args.draft}.csv')
+        store.export_final_csv(args.draft, output)
+        print(f'Wrote {len(store.final_rows(args.draft))} rows to {output}')
+
+
+if __name__ == '__main__':
+    main()
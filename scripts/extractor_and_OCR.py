@@ -1,213 +1,212 @@
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 import os
 import sys
 import re
 import csv
 import glob
-import numpy as np
-import easyocr
+import json
+import time
+import argparse
+import cProfile
+import pstats
+import multiprocessing
+from datetime import datetime
+from importlib.metadata import version
 from PIL import Image, ImageDraw
-import io
-from difflib import get_close_matches
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from functools import lru_cache
+from itertools import islice
 
 # Project root is one level up from this scripts/ folder
 PROJECT_ROOT      = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, PROJECT_ROOT)
-from config import SCOPES, MAIN_FOLDER_ID
+from card_matcher import CardMatcher
+from deck_matcher import match_deck
+from ocr_cache import OCRCache
+from draft_manifest import DraftManifest, BackfillProgress
+from metrics import METRICS
+from player_output import PlayerOutput, save_image_atomic
+from atomic_file import atomic_write
+from draft_store import DraftStore, season_store_path
+from ocr_merge import parse_and_merge_card_names
+from image_sources import DriveSource, LocalFolderSource, DRIVE_TREE_TTL, season_number, draft_date
+from ocr_service import OCRServiceClient, DEFAULT_URL as OCR_SERVICE_URL
+from image_preprocess import PreprocessSettings, load_image, prepare_for_ocr, map_to_original, pad_to_common_size
 
 DRAFTED_DECKS_DIR = os.path.join(PROJECT_ROOT, 'data', 'drafted_decks')
 CLEAN_OUTPUT_DIR  = os.path.join(PROJECT_ROOT, 'data', 'clean')
 CARDLIST_DIR      = os.path.join(PROJECT_ROOT, 'data', 'cardlist')
+OCR_CACHE_DIR     = os.path.join(PROJECT_ROOT, 'data', 'ocr_cache')
+METRICS_DIR       = os.path.join(PROJECT_ROOT, 'data', 'metrics')
+BACKFILL_STATE    = os.path.join(PROJECT_ROOT, 'data', 'backfill.json')
 
 SIMILARITY_THRESHOLD = 0.65
+OCR_GPU              = True
+OCR_LANGUAGES        = ['en']
+OCR_CACHE_MAX_MB     = 50
+
+# Preprocessing before OCR (see image_preprocess.py); downscaling is off unless a target is set
+DEFAULT_PREPROCESS = PreprocessSettings(exif_transpose=True, target_text_height=None, grayscale=False, roi=None)
+
+# Text crops per recognizer forward pass; photos per detector pass in --batch-images mode
+RECOGNIZER_BATCH_SIZE = 16
+OCR_BATCH_IMAGES      = 4
+
+# Pipelined mode defaults (see --pipeline)
+DOWNLOAD_WORKERS = 4
+WRITE_WORKERS    = 2
+MAX_OCR_WORKERS  = 4
+OCR_SERVICE_CLIENT_THREADS = 2  # requests kept in flight to --ocr-service, so its queue never runs dry
 
 # --- Load official card list ---
-cube_lists = glob.glob(os.path.join(CARDLIST_DIR, 'dimlas*_cardlist.csv'))
-if not cube_lists:
-    raise FileNotFoundError(f'No cube list found in {CARDLIST_DIR}')
-CUBE_LIST_FILE = sorted(
-    cube_lists,
-    key=lambda f: int(re.search(r'dimlas(\d+)_cardlist', f).group(1)),
-    reverse=True
-)[0]
-
-official_cards = set()
-name_to_scryfall_id = {}
-with open(CUBE_LIST_FILE, 'r', encoding='utf-8', newline='') as f:
-    reader = csv.DictReader(f)
-    name_col     = next((c for c in reader.fieldnames if c.strip().lower() == 'name'), None)
-    scryfall_col = next((c for c in reader.fieldnames if c.strip().lower() == 'scryfall_id'), None)
-    for row in reader:
-        card = row[name_col].strip()
-        if card:
-            official_cards.add(card)
-            if scryfall_col:
-                name_to_scryfall_id[card] = row[scryfall_col].strip()
-official_cards_lower = {c.lower(): c for c in official_cards}
-print(f'Loaded {len(official_cards)} official cards from {os.path.basename(CUBE_LIST_FILE)}')
+Cube = namedtuple('Cube', ['cards', 'cards_lower', 'scryfall_ids', 'matcher'])
+
+def cube_list_path():
+    """Path of the newest dimlas*_cardlist.csv."""
+    cube_lists = glob.glob(os.path.join(CARDLIST_DIR, 'dimlas*_cardlist.csv'))
+    if not cube_lists:
+        raise FileNotFoundError(f'No cube list found in {CARDLIST_DIR}')
+    return sorted(
+        cube_lists,
+        key=lambda f: int(re.search(r'dimlas(\d+)_cardlist', f).group(1)),
+        reverse=True
+    )[0]
+
+@lru_cache(maxsize=None)
+def get_cube():
+    """Load the newest dimlas*_cardlist.csv once and build the lookup tables."""
+    cube_list_file = cube_list_path()
+
+    official_cards = set()
+    name_to_scryfall_id = {}
+    with open(cube_list_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        name_col     = next((c for c in reader.fieldnames if c.strip().lower() == 'name'), None)
+        scryfall_col = next((c for c in reader.fieldnames if c.strip().lower() == 'scryfall_id'), None)
+        for row in reader:
+            card = row[name_col].strip()
+            if card:
+                official_cards.add(card)
+                if scryfall_col:
+                    name_to_scryfall_id[card] = row[scryfall_col].strip()
+    official_cards_lower = {c.lower(): c for c in official_cards}
+    card_matcher         = CardMatcher(official_cards, cutoff=SIMILARITY_THRESHOLD)
+    print(f'Loaded {len(official_cards)} official cards from {os.path.basename(cube_list_file)}')
+    return Cube(official_cards, official_cards_lower, name_to_scryfall_id, card_matcher)
 
 # --- Initialize EasyOCR ---
-print('Initializing EasyOCR with GPU...')
-reader_ocr = easyocr.Reader(['en'], gpu=True)
-print('EasyOCR ready!\n')
-
-# --- Google Drive auth ---
-TOKEN_PATH       = os.path.join(PROJECT_ROOT, 'token.json')
-CREDENTIALS_PATH = os.path.join(PROJECT_ROOT, 'credentials.json')
-if os.path.exists(TOKEN_PATH):
-    creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
-else:
-    flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
-    creds = flow.run_local_server(port=0)
-    with open(TOKEN_PATH, 'w') as token:
-        token.write(creds.to_json())
-drive_service = build('drive', 'v3', credentials=creds)
-
-# --- Drive helpers ---
-def get_folders(parent_id, name_pattern=None):
-    """Get non-trashed folders from a parent folder."""
-    query   = f"'{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
-    folders = drive_service.files().list(q=query, fields='files(id, name)').execute().get('files', [])
-    if name_pattern:
-        folders = [f for f in folders if re.search(name_pattern, f['name'])]
-    return folders
-
-def get_files(parent_id, mime_type_filter=None):
-    """Get non-trashed files from a folder, sorted by name."""
-    query = f"'{parent_id}' in parents and trashed=false"
-    if mime_type_filter:
-        query += f" and mimeType contains '{mime_type_filter}'"
-    files = drive_service.files().list(q=query, fields='files(id, name, mimeType)').execute().get('files', [])
-    return sorted(files, key=lambda x: x['name'])
-
-def is_player_file(filename):
-    """Check if file is a player file (not an overview/backup file)."""
-    name_lower = filename.lower()
-    if '+' in filename:            return False
-    if 'result'   in name_lower:   return False
-    if 'standing' in name_lower:   return False
-    if re.search(r'^r\d', name_lower): return False
-    return True
-
-def download_image(file_id):
-    """Download image file from Google Drive."""
-    return drive_service.files().get_media(fileId=file_id).execute()
-
-# --- Find newest draft on Drive ---
-print('Locating newest draft on Google Drive...')
-season_folders = get_folders(MAIN_FOLDER_ID, r'Season \d+')
-newest_season  = max(season_folders, key=lambda f: int(re.search(r'Season (\d+)', f['name']).group(1)))
-print(f'  Season  : {newest_season["name"]}')
-
-folders_in_season = get_folders(newest_season['id'])
-pictures_folder   = next(f for f in folders_in_season if f['name'].lower() == 'pictures')
-
-draft_folders = get_folders(pictures_folder['id'], r'\d{8}\s+Draft\s+\d+')
-newest_draft  = max(draft_folders, key=lambda f: int(re.match(r'(\d{8})', f['name']).group(1)))
-print(f'  Draft   : {newest_draft["name"]}')
-
-all_files    = get_files(newest_draft['id'], mime_type_filter='image/')
-player_files = [f for f in all_files if is_player_file(f['name'])]
-print(f'  Players : {len(player_files)} image(s) found\n')
+# easyocr (and torch behind it) is only imported when a reader is actually needed,
+# so importing this module, --list and --dry-run stay fast.
+@lru_cache(maxsize=None)
+def get_reader(gpu=OCR_GPU):
+    """Create the EasyOCR reader for this process on first use."""
+    import easyocr
+    print(f'Initializing EasyOCR {"with GPU" if gpu else "on CPU"}...')
+    reader_ocr = easyocr.Reader(OCR_LANGUAGES, gpu=gpu)
+    print('EasyOCR ready!\n')
+    return reader_ocr
+
+def ocr_engine():
+    """The EasyOCR version and languages this process would OCR with."""
+    return {'languages': OCR_LANGUAGES, 'easyocr': version('easyocr')}
+
+def ocr_settings(preprocess=DEFAULT_PREPROCESS, engine=None):
+    """Everything that changes what readtext() returns for the same image (part of the OCR cache key).
+    `engine` is the ocr_engine() of whoever runs the OCR, when that is not this process (the OCR service).
+    """
+    return {**(engine or ocr_engine()), 'detail': 1, 'preprocess': preprocess._asdict()}
 
 # --- Create output directories ---
-draft_name    = newest_draft['name'].replace(' ', '_')
-output_dir    = os.path.join(DRAFTED_DECKS_DIR, draft_name)
-detailed_dir  = os.path.join(output_dir, 'detailed OCR')
-clean_dir     = os.path.join(CLEAN_OUTPUT_DIR, draft_name)
-clean_img_dir = os.path.join(clean_dir, 'clean images')
-for d in [output_dir, detailed_dir, clean_dir, clean_img_dir]:
-    os.makedirs(d, exist_ok=True)
-
-print(f'Raw CSVs     : {output_dir}')
-print(f'Detailed CSVs: {detailed_dir}')
-print(f'Clean CSVs   : {clean_dir}')
-print(f'Clean images : {clean_img_dir}')
+def make_output_dirs(draft_folder_name, create=True):
+    """Return the per-draft output folders, creating them unless `create` is False."""
+    draft_name = draft_folder_name.replace(' ', '_')
+    output_dir = os.path.join(DRAFTED_DECKS_DIR, draft_name)
+    clean_dir  = os.path.join(CLEAN_OUTPUT_DIR, draft_name)
+    dirs = {
+        'output_dir':    output_dir,
+        'detailed_dir':  os.path.join(output_dir, 'detailed OCR'),
+        'clean_dir':     clean_dir,
+        'clean_img_dir': os.path.join(clean_dir, 'clean images'),
+    }
+    if not create:
+        return dirs
+    for d in dirs.values():
+        os.makedirs(d, exist_ok=True)
+
+    print(f'Raw CSVs     : {dirs["output_dir"]}')
+    print(f'Detailed CSVs: {dirs["detailed_dir"]}')
+    print(f'Clean CSVs   : {dirs["clean_dir"]}')
+    print(f'Clean images : {dirs["clean_img_dir"]}')
+    return dirs
+
+def outputs_exist(file, dirs):
+    """True if all of a player's output files are still on disk."""
+    player_name = os.path.splitext(file['name'])[0]
+    return all(os.path.exists(p) for p in (
+        os.path.join(dirs['output_dir'], f'{player_name}.csv'),
+        os.path.join(dirs['detailed_dir'], f'detailed_{player_name}.csv'),
+        os.path.join(dirs['clean_dir'], f'clean_{player_name}.csv'),
+        os.path.join(dirs['clean_img_dir'], f'annotated_{player_name}.jpeg'),
+    ))
+
+# --- Download ---
+def download_image(source, file):
+    """Stream one player photo to a spool file; returns a SpooledPhoto (discard() it once written)."""
+    with METRICS.timer('download'):
+        photo = source.spool(file)
+    METRICS.count('download.bytes', photo.size)
+    return photo
 
 # --- OCR helpers ---
-def extract_text_from_image(image_bytes):
-    """Extract text from image bytes using EasyOCR."""
-    image   = Image.open(io.BytesIO(image_bytes))
-    results = reader_ocr.readtext(np.array(image), detail=1)
-    return image, results
-
-def boxes_are_adjacent(bbox1, bbox2, max_x_distance=30, max_y_distance=10):
-    """Check if two bounding boxes are close enough to be the same card name."""
-    x1_min = min(p[0] for p in bbox1); x1_max = max(p[0] for p in bbox1)
-    y1_min = min(p[1] for p in bbox1); y1_max = max(p[1] for p in bbox1)
-    x2_min = min(p[0] for p in bbox2); x2_max = max(p[0] for p in bbox2)
-    y2_min = min(p[1] for p in bbox2); y2_max = max(p[1] for p in bbox2)
-    y_overlap      = not (y1_max < y2_min - max_y_distance or y2_max < y1_min - max_y_distance)
-    horizontal_gap = min(abs(x1_max - x2_min), abs(x2_max - x1_min))
-    return y_overlap and horizontal_gap <= max_x_distance
-
-def merge_bboxes(bboxes):
-    """Merge multiple bounding boxes into one encompassing box."""
-    all_x = [p[0] for bbox in bboxes for p in bbox]
-    all_y = [p[1] for bbox in bboxes for p in bbox]
-    return [(min(all_x), min(all_y)), (max(all_x), min(all_y)),
-            (max(all_x), max(all_y)), (min(all_x), max(all_y))]
-
-def should_keep_text(text):
-    """Filter out noise: short strings, mana symbols, UI labels, etc."""
-    if len(text) < 3 or len(text) > 50:  return False
-    if not any(c.isalpha() for c in text): return False
-    if text.lower() in ['tap', 'untap', 'mana', 'cost', 'main', 'deck', 'sideboard']: return False
-    if all(c.isdigit() or c in '{}/WUBRGC' for c in text): return False
-    return True
-
-def parse_and_merge_card_names(ocr_results):
-    """Group adjacent OCR detections into single card names, sorted top to bottom."""
-    filtered = []
-    for bbox, text, confidence in ocr_results:
-        if confidence < 0.05: continue
-        text = text.strip()
-        if not should_keep_text(text): continue
-        filtered.append({
-            'bbox': bbox, 'text': text, 'confidence': confidence,
-            'x_min': min(p[0] for p in bbox), 'y_position': bbox[0][1]
-        })
-
-    merged_cards = []
-    used = set()
-    for i, det in enumerate(filtered):
-        if i in used: continue
-        group = [det]; used.add(i)
-        changed = True
-        while changed:
-            changed = False
-            for j, other in enumerate(filtered):
-                if j in used: continue
-                if any(boxes_are_adjacent(g['bbox'], other['bbox']) for g in group):
-                    group.append(other); used.add(j); changed = True; break
-        group.sort(key=lambda x: x['x_min'])
-        merged_cards.append({
-            'text':       ' '.join(d['text'] for d in group),
-            'confidence': sum(d['confidence'] for d in group) / len(group),
-            'bbox':       merge_bboxes([d['bbox'] for d in group]),
-            'y_position': group[0]['y_position']
-        })
-
-    merged_cards.sort(key=lambda x: x['y_position'])
-    return merged_cards
+def extract_text_from_image(photo, reader_ocr=None, preprocess=DEFAULT_PREPROCESS):
+    """Extract text from a photo (bytes or file path) using EasyOCR.
+    Returns the decoded image and detections in its pixel coordinates, whatever preprocessing was applied.
+    The OCR array is dropped on return, so the decoded image is the only full-size buffer left.
+    """
+    reader_ocr = reader_ocr or get_reader()
+    with METRICS.timer('decode'):
+        image = load_image(photo, preprocess)
+    with METRICS.timer('preprocess'):
+        array, transform = prepare_for_ocr(image, preprocess, reader_ocr)
+    with METRICS.timer('readtext'):
+        results = reader_ocr.readtext(array, detail=1, batch_size=RECOGNIZER_BATCH_SIZE)
+    return image, map_to_original(results, transform)
+
+def extract_text_from_images(photos, reader_ocr=None, preprocess=DEFAULT_PREPROCESS,
+                             batch_size=RECOGNIZER_BATCH_SIZE):
+    """Batched extract_text_from_image(): one detector pass over all photos (padded to a common
+    size) and recognizer passes of `batch_size` text crops. Returns [(image, detections)] in input order.
+    """
+    reader_ocr = reader_ocr or get_reader()
+    images, arrays, transforms = [], [], []
+    for photo in photos:
+        with METRICS.timer('decode'):
+            image = load_image(photo, preprocess)
+        with METRICS.timer('preprocess'):
+            array, transform = prepare_for_ocr(image, preprocess, reader_ocr)
+        images.append(image); arrays.append(array); transforms.append(transform)
+
+    with METRICS.timer('readtext_batched'):
+        batch_results = reader_ocr.readtext_batched(pad_to_common_size(arrays), detail=1, batch_size=batch_size)
+    return [(image, map_to_original(results, transform))
+            for image, results, transform in zip(images, batch_results, transforms)]
 
 # --- Card validation ---
 def validate_card(ocr_text, seen):
-    """Match a single OCR result against the official card list.
+    """Match a single OCR result against the official card list (greedy; photos go through match_deck).
     Returns (status, official_name). Status: exact | exact_corrected | fuzzy | duplicate | unmatched.
     `seen` is a set of already-used official names for duplicate detection.
     """
-    if ocr_text.lower() in official_cards_lower:
-        official_name = official_cards_lower[ocr_text.lower()]
+    cube = get_cube()
+    if ocr_text.lower() in cube.cards_lower:
+        official_name = cube.cards_lower[ocr_text.lower()]
         if official_name in seen:
             return 'duplicate', official_name
         seen.add(official_name)
         return ('exact' if ocr_text == official_name else 'exact_corrected'), official_name
-    matches = get_close_matches(ocr_text, official_cards, n=1, cutoff=SIMILARITY_THRESHOLD)
-    if matches:
-        official_name = matches[0]
+    # OCR-confusion variants ("Hymn t0 Tourach", "Kolaghans Command") resolve without a fuzzy scan
+    official_name = cube.matcher.variant_match(ocr_text) or cube.matcher.best_match(ocr_text)
+    if official_name:
         if official_name in seen:
             return 'duplicate', official_name
         seen.add(official_name)
@@ -215,93 +214,568 @@ def validate_card(ocr_text, seen):
     return 'unmatched', None
 
 # --- Image drawing ---
-def draw_colored_boxes(image, merged_cards):
-    """Draw green boxes for matched cards and red boxes for unmatched cards."""
-    img_out = image.copy()
-    draw    = ImageDraw.Draw(img_out)
+def draw_colored_boxes(image, merged_cards, max_side=None, in_place=False):
+    """Draw green boxes for matched cards and red boxes for unmatched cards.
+    With `max_side`, boxes are drawn on a downscaled preview instead of a full-size copy;
+    with `in_place`, a full-size result is drawn on `image` itself.
+    """
+    scale = 1.0
+    if max_side and max(image.size) > max_side:
+        scale   = max_side / max(image.size)
+        img_out = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.BILINEAR)
+    else:
+        img_out = image if in_place else image.copy()
+    draw  = ImageDraw.Draw(img_out)
+    width = max(2, round(6 * scale))
     for card in merged_cards:
         color = 'green' if card['status'] in ('exact', 'exact_corrected', 'fuzzy') else 'red'
-        draw.polygon(card['bbox'], outline=color, width=6)
+        bbox  = card['bbox'] if scale == 1.0 else [(x * scale, y * scale) for x, y in card['bbox']]
+        draw.polygon(bbox, outline=color, width=width)
     return img_out
 
-# --- Main processing loop ---
-print(f'Processing {len(player_files)} player(s)...')
-print('-' * 60)
-
-for idx, file in enumerate(player_files, 1):
-    player_name = os.path.splitext(file['name'])[0]
-    print(f'\n[{idx}/{len(player_files)}] {player_name}')
-
-    try:
-        print('  -> Downloading...')
-        image_bytes = download_image(file['id'])
-
-        print('  -> Running OCR...')
-        original_image, ocr_results = extract_text_from_image(image_bytes)
+# --- Per-player output ---
+def validate_and_save(player_name, original_image, ocr_results, dirs, preview_max_side=None, store=None):
+    """Merge and validate OCR detections, streaming each card to the three CSVs, then write the annotated image.
+    With a DraftStore, the validated detections are also saved to the season store.
+    The boxes are drawn onto `original_image` itself, which callers must not reuse afterwards.
+    """
+    with METRICS.timer('merge'):
         merged_cards = parse_and_merge_card_names(ocr_results)
 
-        # Validate each detected card against the official list
-        seen = set()
-        for card in merged_cards:
-            status, official_name     = validate_card(card['text'], seen)
+    # Match all of the photo's detections against the official list at once (see deck_matcher.py),
+    # then write each card's rows in a single pass
+    cube = get_cube()
+    with METRICS.timer('match_deck'):
+        matches = match_deck([card['text'] for card in merged_cards], cube.cards_lower, cube.matcher)
+    with PlayerOutput(player_name, dirs, cube.scryfall_ids) as out:
+        for card, (status, official_name) in zip(merged_cards, matches):
             card['status']            = status
             card['official_name']     = official_name
+            METRICS.count(f'status.{status}')
+            with METRICS.timer('csv_write'):
+                out.add(card)
+
+    if store is not None:
+        with METRICS.timer('store_write'):
+            store.write_detections(os.path.basename(dirs['clean_dir']), player_name, merged_cards, cube.scryfall_ids)
+
+    # Save color-coded annotated image -> data/clean/{draft}/clean images/
+    with METRICS.timer('draw_colored_boxes'):
+        colored_image = draw_colored_boxes(original_image, merged_cards, preview_max_side, in_place=True)
+    img_path = os.path.join(dirs['clean_img_dir'], f'annotated_{player_name}.jpeg')
+    with METRICS.timer('jpeg_write'):
+        save_image_atomic(colored_image, img_path, quality=90)
 
-        n_exact     = sum(1 for c in merged_cards if c['status'] in ('exact', 'exact_corrected'))
-        n_corrected = sum(1 for c in merged_cards if c['status'] == 'fuzzy')
-        n_unmatched = sum(1 for c in merged_cards if c['status'] == 'unmatched')
-        n_duplicate = sum(1 for c in merged_cards if c['status'] == 'duplicate')
-        print(f'  -> {len(merged_cards)} detections: {n_exact} exact, {n_corrected} corrected, {n_unmatched} unmatched, {n_duplicate} duplicates')
-
-        # Save color-coded annotated image -> data/clean/{draft}/clean images/
-        colored_image = draw_colored_boxes(original_image, merged_cards)
-        img_path = os.path.join(clean_img_dir, f'annotated_{player_name}.jpeg')
-        colored_image.save(img_path, quality=90)
-
-        # Save raw OCR CSV (unvalidated) -> data/drafted_decks/{draft}/
-        raw_csv_path = os.path.join(output_dir, f'{player_name}.csv')
-        with open(raw_csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['name'])
-            for card in merged_cards:
-                writer.writerow([card['text']])
-
-        # Save detailed validation CSV -> data/drafted_decks/{draft}/detailed OCR/
-        detailed_path = os.path.join(detailed_dir, f'detailed_{player_name}.csv')
-        with open(detailed_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['status', 'official_name', 'ocr_input', 'note'])
-            for card in merged_cards:
-                s     = card['status']
-                oname = card['official_name'] or ''
-                ocr   = card['text']
-                if s in ('exact', 'exact_corrected'):
-                    writer.writerow(['exact',     oname, ocr, ''])
-                elif s == 'fuzzy':
-                    writer.writerow(['corrected', oname, ocr, f'corrected from: {ocr}'])
-                elif s == 'unmatched':
-                    writer.writerow(['unmatched', '',    ocr, 'no match found'])
-                elif s == 'duplicate':
-                    writer.writerow(['duplicate', oname, ocr, 'duplicate removed'])
-
-        # Save clean deck list -> data/clean/{draft}/
-        clean_csv_path = os.path.join(clean_dir, f'clean_{player_name}.csv')
-        with open(clean_csv_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['name', 'scryfall_id'])
-            for card in merged_cards:
-                if card['status'] in ('exact', 'exact_corrected', 'fuzzy'):
-                    writer.writerow([card['official_name'], name_to_scryfall_id.get(card['official_name'], '')])
-
-        print(f'  annotated_{player_name}.jpeg')
-        print(f'  detailed_{player_name}.csv')
-        print(f'  clean_{player_name}.csv')
-
-    except Exception as e:
-        print(f'  ERROR: {e}')
-
-print(f'\n{"=" * 60}')
-print(f'Done!')
-print(f'  Clean images  -> {clean_img_dir}')
-print(f'  Clean CSVs    -> {clean_dir}')
-print(f'  Detailed CSVs -> {detailed_dir}')
+    return out.summary()
+
+# --- Main processing loop ---
+def run_sequential(source, player_files, dirs, ocr_cache=None, on_done=None, preprocess=DEFAULT_PREPROCESS,
+                   ocr_service=None, preview_max_side=None, store=None):
+    """Download, OCR, validate and write each player one after another."""
+    for idx, file in enumerate(player_files, 1):
+        player_name = os.path.splitext(file['name'])[0]
+        print(f'\n[{idx}/{len(player_files)}] {player_name}')
+
+        photo = None
+        try:
+            print('  -> Downloading...')
+            photo = download_image(source, file)
+
+            cache_key   = ocr_cache.key(md5=photo.md5) if ocr_cache else None
+            ocr_results = ocr_cache.get(cache_key) if ocr_cache else None
+            if ocr_results is None:
+                print('  -> Running OCR...')
+                if ocr_service:
+                    with METRICS.timer('ocr_service'):
+                        ocr_results = ocr_service.readtext(photo.path, preprocess)
+                    original_image = load_image(photo.path, preprocess)
+                else:
+                    original_image, ocr_results = extract_text_from_image(photo.path, preprocess=preprocess)
+                if ocr_cache:
+                    ocr_cache.put(cache_key, ocr_results)
+            else:
+                print('  -> OCR cache hit')
+                original_image = load_image(photo.path, preprocess)
+            summary = validate_and_save(player_name, original_image, ocr_results, dirs, preview_max_side, store)
+            print(f'  -> {summary}')
+
+            print(f'  annotated_{player_name}.jpeg')
+            print(f'  detailed_{player_name}.csv')
+            print(f'  clean_{player_name}.csv')
+            if on_done:
+                on_done(file)
+
+        except Exception as e:
+            print(f'  ERROR: {e}')
+        finally:
+            if photo:
+                photo.discard()
+
+# --- Batched mode ---
+def run_batched(source, player_files, dirs, batch_images, download_workers, ocr_cache=None, on_done=None,
+                preprocess=DEFAULT_PREPROCESS, batch_size=RECOGNIZER_BATCH_SIZE, preview_max_side=None, store=None):
+    """OCR players in groups of `batch_images` photos per EasyOCR call."""
+    print(f'Batched mode: {batch_images} photo(s) per OCR batch')
+    with ThreadPoolExecutor(download_workers) as download_pool:
+        for start in range(0, len(player_files), batch_images):
+            chunk = player_files[start:start + batch_images]
+            print(f'\n[{start + 1}-{start + len(chunk)}/{len(player_files)}] '
+                  + ', '.join(os.path.splitext(f['name'])[0] for f in chunk))
+
+            downloads = [download_pool.submit(download_image, source, f) for f in chunk]
+            photos, results = {}, {}
+            try:
+                for file, future in zip(chunk, downloads):
+                    try:
+                        photos[file['id']] = future.result()
+                    except Exception as e:
+                        print(f'  {os.path.splitext(file["name"])[0]}: ERROR during download: {e}')
+                        continue
+                    if ocr_cache:
+                        cached = ocr_cache.get(ocr_cache.key(md5=photos[file['id']].md5))
+                        if cached is not None:
+                            results[file['id']] = (load_image(photos[file['id']].path, preprocess), cached)
+
+                to_ocr = [file_id for file_id in photos if file_id not in results]
+                if to_ocr:
+                    print(f'  -> Running OCR on {len(to_ocr)} photo(s)...')
+                    try:
+                        batch = extract_text_from_images([photos[i].path for i in to_ocr], preprocess=preprocess,
+                                                         batch_size=batch_size)
+                    except Exception as e:
+                        print(f'  ERROR during OCR: {e}')
+                        batch = []
+                    for file_id, (image, ocr_results) in zip(to_ocr, batch):
+                        results[file_id] = (image, ocr_results)
+                        if ocr_cache:
+                            ocr_cache.put(ocr_cache.key(md5=photos[file_id].md5), ocr_results)
+
+                for file in chunk:
+                    if file['id'] not in results:
+                        continue
+                    player_name = os.path.splitext(file['name'])[0]
+                    try:
+                        # pop: each decoded image is released as soon as it is written
+                        summary = validate_and_save(player_name, *results.pop(file['id']), dirs, preview_max_side, store)
+                    except Exception as e:
+                        print(f'  {player_name}: ERROR: {e}')
+                        continue
+                    print(f'  {player_name}: {summary}')
+                    if on_done:
+                        on_done(file)
+            finally:
+                for photo in photos.values():
+                    photo.discard()
+
+# --- Pipelined mode ---
+# Each OCR worker process holds its own EasyOCR reader, created once by the pool initializer.
+_worker_reader = None
+
+def _init_ocr_worker(gpu, torch_threads):
+    global _worker_reader
+    import easyocr
+    import torch
+    torch.set_num_threads(torch_threads)
+    _worker_reader = easyocr.Reader(OCR_LANGUAGES, gpu=gpu, verbose=False)
+
+def _ocr_worker(photo_path, preprocess):
+    _, results = extract_text_from_image(photo_path, _worker_reader, preprocess)
+    return results
+
+def _ocr_in_process(photo_path, preprocess):
+    _, results = extract_text_from_image(photo_path, preprocess=preprocess)
+    return results
+
+def default_ocr_workers():
+    """One reader on a GPU; on CPU-only machines one reader per couple of cores."""
+    import torch
+    if OCR_GPU and torch.cuda.is_available():
+        return 1
+    return max(1, min(MAX_OCR_WORKERS, (os.cpu_count() or 1) // 2))
+
+def make_ocr_pool(ocr_workers, ocr_service=None):
+    """Process pool for OCR; a single in-process thread when only one worker is wanted,
+    or threads submitting to a running OCR service.
+    """
+    if ocr_service:
+        return ThreadPoolExecutor(max_workers=ocr_workers), ocr_service.readtext
+    if ocr_workers <= 1:
+        return ThreadPoolExecutor(max_workers=1), _ocr_in_process
+    import torch
+    gpu           = OCR_GPU and torch.cuda.is_available()
+    torch_threads = max(1, (os.cpu_count() or 1) // ocr_workers)
+    pool = ProcessPoolExecutor(
+        max_workers=ocr_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_ocr_worker,
+        initargs=(gpu, torch_threads),
+    )
+    return pool, _ocr_worker
+
+def run_pipelined(source, player_files, dirs, download_workers, ocr_workers, write_workers, ocr_cache=None, on_done=None,
+                  preprocess=DEFAULT_PREPROCESS, ocr_service=None, preview_max_side=None, store=None, outputs=None):
+    """Overlap Drive downloads, OCR and CSV/JPEG writing across players.
+
+    `outputs(file) -> (dirs, store)` overrides `dirs` / `store` per photo, for runs spanning several drafts.
+    Downloads only run ahead of the other stages by a few photos, so spooled photos
+    (temp files for Drive) never pile up beyond one per worker.
+    """
+    print(f'Pipelined mode: {download_workers} download, {ocr_workers} OCR, {write_workers} write worker(s)')
+    get_cube()  # load once up front rather than inside the first write task
+    ocr_pool, ocr_fn = make_ocr_pool(ocr_workers, ocr_service)
+    with ThreadPoolExecutor(download_workers) as download_pool, ocr_pool, ThreadPoolExecutor(write_workers) as write_pool:
+        def write(file, photo, ocr_results):
+            # Decoded on the write worker, so at most `write_workers` full-size images are in memory here
+            file_dirs, file_store = outputs(file) if outputs else (dirs, store)
+            image = load_image(photo.path, preprocess)
+            return validate_and_save(os.path.splitext(file['name'])[0], image, ocr_results, file_dirs, preview_max_side, file_store)
+
+        def submit_write(file, photo, ocr_results):
+            pending[write_pool.submit(write, file, photo, ocr_results)] = ('write', file, photo)
+
+        def label(file):
+            player_name = os.path.splitext(file['name'])[0]
+            return f'{os.path.basename(outputs(file)[0]["output_dir"])} / {player_name}' if outputs else player_name
+
+        # Photos between their download and the end of their write, at most one per worker
+        queued    = iter(player_files)
+        in_flight = 0
+        max_in_flight = download_workers + ocr_workers + write_workers
+
+        def submit_downloads():
+            nonlocal in_flight
+            for f in islice(queued, max_in_flight - in_flight):
+                pending[download_pool.submit(download_image, source, f)] = ('download', f, None)
+                in_flight += 1
+
+        # future -> (stage, file, spooled photo carried to the write stage)
+        pending = {}
+        n_done  = 0
+        submitted = {}
+        submit_downloads()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, file, photo = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    n_done   += 1
+                    in_flight -= 1
+                    print(f'[{n_done}/{len(player_files)}] {label(file)}: ERROR during {stage}: {e}')
+                    if photo:
+                        photo.discard()
+                    continue
+
+                if stage == 'download':
+                    cached = ocr_cache.get(ocr_cache.key(md5=result.md5)) if ocr_cache else None
+                    if cached is not None:
+                        submit_write(file, result, cached)
+                    else:
+                        submitted[file['id']] = time.perf_counter()
+                        pending[ocr_pool.submit(ocr_fn, result.path, preprocess)] = ('ocr', file, result)
+                elif stage == 'ocr':
+                    # submit -> result, including time queued for a worker (worker-side timers stay in the worker)
+                    METRICS.add_time('ocr_job', time.perf_counter() - submitted.pop(file['id']))
+                    if ocr_cache:
+                        ocr_cache.put(ocr_cache.key(md5=photo.md5), result)
+                    submit_write(file, photo, result)
+                else:
+                    photo.discard()
+                    n_done   += 1
+                    in_flight -= 1
+                    print(f'[{n_done}/{len(player_files)}] {label(file)}: {result}')
+                    if on_done:
+                        on_done(file)
+            submit_downloads()
+
+def forget_stored_players(season, dirs, player_files):
+    """Without the store, drop the players about to be re-extracted from it, so it can't outlive their CSVs."""
+    path = season_store_path(season)
+    if os.path.exists(path):
+        DraftStore(path).forget_detections(os.path.basename(dirs['clean_dir']), [os.path.splitext(f['name'])[0] for f in player_files])
+
+# --- Backfill ---
+def select_drafts(source, seasons=None, date_from=None, date_to=None):
+    """Every draft (oldest first) of the given season numbers within [date_from, date_to], tagged with its season."""
+    drafts = []
+    for season in sorted(source.seasons(), key=season_number):
+        if seasons and season_number(season) not in seasons:
+            continue
+        for draft in source.drafts(season):
+            if (date_from and draft_date(draft) < date_from) or (date_to and draft_date(draft) > date_to):
+                continue
+            draft['season'] = season['name']
+            drafts.append(draft)
+    return sorted(drafts, key=draft_date)
+
+def backfill_run_id(resume, save=True):
+    """Id of the backfill run: the last one's with --resume, else a new one (saved for a later --resume unless `save` is off)."""
+    if resume and os.path.exists(BACKFILL_STATE):
+        with open(BACKFILL_STATE, 'r', encoding='utf-8') as f:
+            return json.load(f)['run']
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if save:
+        with atomic_write(BACKFILL_STATE) as f:
+            json.dump({'run': run_id}, f)
+    return run_id
+
+def run_backfill(source, args, preprocess, ocr_cache=None, ocr_service=None):
+    """Re-process every selected draft, scheduling all their photos on one set of worker pools.
+
+    Each finished photo is recorded in its draft's manifest.json and backfill.json,
+    so an interrupted run continues with `--resume` where it stopped.
+    """
+    run_id = backfill_run_id(args.resume, save=not args.dry_run)
+    drafts = select_drafts(source, args.season, args.date_from, args.date_to)
+    print(f'Backfill {run_id}: {len(drafts)} draft(s) on {source.describe()}')
+
+    player_files, targets, stores = [], {}, {}
+    for draft in drafts:
+        dirs     = make_output_dirs(draft['name'], create=False)
+        progress = BackfillProgress(dirs['output_dir'], run_id)
+        if progress.complete:
+            print(f'  {draft["name"]:<24} done in this run, skipped')
+            continue
+        files = [f for f in source.player_files(draft) if not progress.is_current(f)]
+        print(f'  {draft["name"]:<24} {len(files):>3} player photo(s)')
+        if args.dry_run:
+            continue
+        for d in dirs.values():
+            os.makedirs(d, exist_ok=True)
+        if args.no_store:
+            forget_stored_players(draft['season'], dirs, files)
+        elif draft['season'] not in stores:
+            stores[draft['season']] = DraftStore(season_store_path(draft['season']))
+        manifest = DraftManifest(dirs['output_dir'])
+        manifest.bind_card_list(cube_list_path())
+        progress.expect(files)
+        for f in files:
+            targets[f['id']] = (dirs, stores.get(draft['season']), manifest, progress)
+        player_files.extend(files)
+
+    if args.dry_run or not player_files:
+        return player_files
+
+    def on_done(file):
+        _, _, manifest, progress = targets[file['id']]
+        manifest.record(file)
+        progress.record(file)
+
+    if args.ocr_workers is not None:
+        ocr_workers = args.ocr_workers
+    else:
+        ocr_workers = OCR_SERVICE_CLIENT_THREADS if ocr_service else default_ocr_workers()
+    print(f'Processing {len(player_files)} player(s)...')
+    print('-' * 60)
+    run_pipelined(source, player_files, None, args.download_workers, ocr_workers, args.write_workers, ocr_cache, on_done,
+                  preprocess, ocr_service, args.preview_max_side, outputs=lambda f: targets[f['id']][:2])
+
+    unfinished = sorted({targets[f['id']][0]['output_dir'] for f in player_files if not targets[f['id']][3].complete})
+    for output_dir in unfinished:
+        print(f'  Incomplete: {os.path.basename(output_dir)} (re-run with --backfill --resume)')
+    return player_files
+
+# --- Listing / dry run ---
+def list_drafts(source):
+    """Print every season and draft with its number of player photos."""
+    for season in sorted(source.seasons(), key=season_number):
+        print(season['name'])
+        for draft in sorted(source.drafts(season), key=draft_date):
+            print(f'  {draft["name"]:<24} {len(source.player_files(draft)):>3} player photo(s)')
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='OCR the newest draft on Google Drive (or a local copy).')
+    parser.add_argument('--list', action='store_true',
+                        help='list all seasons and drafts with their photo counts, then exit')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='show which photos would be processed without loading the OCR model or writing anything')
+    parser.add_argument('--local', metavar='FOLDER',
+                        help='read photos from a local Season N/Pictures/YYYYMMDD Draft N/ tree instead of Drive')
+    parser.add_argument('--refresh-tree', action='store_true',
+                        help='with --list / --backfill, re-list the Drive season/draft folders instead of using data/cache/drive_tree.json')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--pipeline', action='store_true',
+                      help='run downloads, OCR and writing as concurrent stages')
+    mode.add_argument('--batch-images', type=int, nargs='?', const=OCR_BATCH_IMAGES, default=None, metavar='N',
+                      help=f'OCR N photos per EasyOCR call (default N: {OCR_BATCH_IMAGES})')
+    parser.add_argument('--ocr-service', nargs='?', const=OCR_SERVICE_URL, default=None, metavar='URL',
+                        help=f'send photos to a running ocr_service.py instead of loading EasyOCR here (default URL: {OCR_SERVICE_URL})')
+    parser.add_argument('--recognizer-batch-size', type=int, default=RECOGNIZER_BATCH_SIZE,
+                        help=f'text crops per recognizer pass in --batch-images mode (default: {RECOGNIZER_BATCH_SIZE})')
+    parser.add_argument('--download-workers', type=int, default=DOWNLOAD_WORKERS)
+    parser.add_argument('--ocr-workers', type=int, default=None,
+                        help='OCR processes, each with its own EasyOCR reader (default: 1 on GPU, else cores/2 up to 4)')
+    parser.add_argument('--write-workers', type=int, default=WRITE_WORKERS)
+    parser.add_argument('--incremental', action='store_true',
+                        help="only process photos that are new or changed since the draft's manifest.json")
+    parser.add_argument('--no-cache', action='store_true',
+                        help='always run OCR instead of reusing cached detections for unchanged photos')
+    parser.add_argument('--cache-max-mb', type=float, default=OCR_CACHE_MAX_MB,
+                        help=f'OCR cache size before least recently used entries are evicted (default: {OCR_CACHE_MAX_MB})')
+    parser.add_argument('--target-text-height', type=int, default=DEFAULT_PREPROCESS.target_text_height,
+                        help='downscale photos so card-name text is about this many pixels tall before OCR')
+    parser.add_argument('--grayscale', action='store_true', help='OCR a grayscale copy of the photo')
+    parser.add_argument('--roi', type=parse_roi, default=DEFAULT_PREPROCESS.roi, metavar='LEFT,TOP,RIGHT,BOTTOM',
+                        help='only OCR this region, as fractions of the photo size (e.g. 0,0,0.5,1)')
+    parser.add_argument('--no-exif-transpose', action='store_true',
+                        help='ignore the EXIF orientation tag')
+    parser.add_argument('--preview-max-side', type=int, default=None, metavar='PX',
+                        help='save the annotated JPEG as a preview at most PX pixels on its long side (default: full size)')
+    parser.add_argument('--no-store', action='store_true',
+                        help="don't save detections to the season's data/store/{season}.sqlite (CSVs only; re-extracted players are dropped from it)")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='where to write the run\'s timing/counter JSON (default: data/metrics/{draft}_{time}.json)')
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='PATH',
+                        help='run under cProfile, print the top functions and save stats (default: next to the metrics file)')
+    backfill = parser.add_argument_group('backfill', 'Re-process past drafts instead of only the newest one (runs --pipeline)')
+    backfill.add_argument('--backfill', action='store_true',
+                          help='process every draft of every season (narrow down with the options below)')
+    backfill.add_argument('--season', type=int, action='append', metavar='N',
+                          help='only drafts of Season N (repeatable)')
+    backfill.add_argument('--from', dest='date_from', type=parse_date, metavar='YYYYMMDD',
+                          help='only drafts on or after this date')
+    backfill.add_argument('--to', dest='date_to', type=parse_date, metavar='YYYYMMDD',
+                          help='only drafts on or before this date')
+    backfill.add_argument('--resume', action='store_true',
+                          help='continue the last backfill run, skipping drafts and photos it already finished')
+    args = parser.parse_args(argv)
+    if args.backfill and args.batch_images:
+        parser.error('--backfill always runs pipelined; it cannot be combined with --batch-images')
+    if args.backfill and args.incremental:
+        parser.error('--backfill skips finished photos with --resume; it cannot be combined with --incremental')
+    return args
+
+def parse_date(value):
+    if not re.fullmatch(r'\d{8}', value):
+        raise argparse.ArgumentTypeError('expected YYYYMMDD')
+    return int(value)
+
+def parse_roi(value):
+    roi = tuple(float(v) for v in value.split(','))
+    if len(roi) != 4 or not (0 <= roi[0] < roi[2] <= 1 and 0 <= roi[1] < roi[3] <= 1):
+        raise argparse.ArgumentTypeError('expected LEFT,TOP,RIGHT,BOTTOM fractions between 0 and 1')
+    return roi
+
+def main(argv=None):
+    args   = parse_args(argv)
+    source = LocalFolderSource(args.local) if args.local else DriveSource(tree_ttl=0 if args.refresh_tree else DRIVE_TREE_TTL)
+    if args.list:
+        list_drafts(source)
+        return
+
+    preprocess = DEFAULT_PREPROCESS._replace(
+        exif_transpose=not args.no_exif_transpose,
+        target_text_height=args.target_text_height,
+        grayscale=args.grayscale or DEFAULT_PREPROCESS.grayscale,
+        roi=args.roi,
+    )
+
+    if args.backfill:
+        if args.dry_run:
+            run_backfill(source, args, preprocess)
+            return
+        newest_draft, player_files, dirs = None, [], None
+    else:
+        newest_draft, player_files = source.find_newest_draft()
+        dirs = make_output_dirs(newest_draft['name'], create=not args.dry_run)
+
+        manifest = DraftManifest(dirs['output_dir'])
+        if not manifest.bind_card_list(cube_list_path()) and args.incremental:
+            print('Incremental: card list changed since the last run, re-processing all players')
+        elif args.incremental:
+            unchanged    = [f for f in player_files if manifest.is_current(f) and outputs_exist(f, dirs)]
+            player_files = [f for f in player_files if f not in unchanged]
+            print(f'Incremental: {len(unchanged)} unchanged player(s) skipped')
+
+        if args.dry_run:
+            print(f'Dry run: would process {len(player_files)} player(s) into {dirs["output_dir"]}')
+            for file in player_files:
+                print(f'  {os.path.splitext(file["name"])[0]}')
+            return
+
+    ocr_service, engine = None, None
+    if args.ocr_service:
+        ocr_service = OCRServiceClient(args.ocr_service)
+        health      = ocr_service.health()
+        if health is None:
+            print(f'OCR service not reachable at {args.ocr_service}, running OCR in this process')
+            ocr_service = None
+        else:
+            # Cache under the service's EasyOCR, not this process's; a service too old to report it gets its own key
+            engine = health.get('engine') or {'service': ocr_service.url}
+            if args.batch_images:
+                print('Using the OCR service; --batch-images is ignored')
+                args.batch_images = None
+
+    ocr_cache = None
+    if not args.no_cache:
+        ocr_cache = OCRCache(OCR_CACHE_DIR, ocr_settings(preprocess, engine), max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+    store = None
+    if args.no_store and not args.backfill:
+        forget_stored_players(newest_draft['season'], dirs, player_files)
+    elif not args.backfill:
+        store = DraftStore(season_store_path(newest_draft['season']))
+
+    get_cube()
+    if not args.backfill:
+        print(f'Processing {len(player_files)} player(s)...')
+        print('-' * 60)
+    METRICS.reset()
+    started_at = datetime.now().strftime('%Y%m%d_%H%M%S')
+    profiler = cProfile.Profile() if args.profile is not None else None
+    if profiler:
+        profiler.enable()
+    start = time.perf_counter()
+
+    if args.backfill:
+        player_files = run_backfill(source, args, preprocess, ocr_cache, ocr_service)
+    elif args.pipeline:
+        if args.ocr_workers is not None:
+            ocr_workers = args.ocr_workers
+        else:
+            ocr_workers = OCR_SERVICE_CLIENT_THREADS if ocr_service else default_ocr_workers()
+        run_pipelined(source, player_files, dirs, args.download_workers, ocr_workers, args.write_workers, ocr_cache, manifest.record,
+                      preprocess, ocr_service, args.preview_max_side, store)
+    elif args.batch_images:
+        run_batched(source, player_files, dirs, args.batch_images, args.download_workers, ocr_cache,
+                    manifest.record, preprocess, args.recognizer_batch_size, args.preview_max_side, store)
+    else:
+        run_sequential(source, player_files, dirs, ocr_cache, manifest.record, preprocess, ocr_service,
+                       args.preview_max_side, store)
+
+    elapsed = time.perf_counter() - start
+    if profiler:
+        profiler.disable()
+
+    print(f'\n{"=" * 60}')
+    print(f'Done in {elapsed:.1f}s!')
+    if dirs:
+        print(f'  Clean images  -> {dirs["clean_img_dir"]}')
+        print(f'  Clean CSVs    -> {dirs["clean_dir"]}')
+        print(f'  Detailed CSVs -> {dirs["detailed_dir"]}')
+    if store:
+        print(f'  Season store  -> {store.path}')
+    if ocr_cache:
+        print(f'  OCR cache     -> {ocr_cache.hits} hit(s), {ocr_cache.misses} miss(es)')
+        METRICS.count('ocr_cache.hit', ocr_cache.hits)
+        METRICS.count('ocr_cache.miss', ocr_cache.misses)
+
+    run_name     = 'backfill' if args.backfill else os.path.basename(dirs['output_dir'])
+    metrics_path = args.metrics or os.path.join(METRICS_DIR, f'{run_name}_{started_at}.json')
+    mode = 'backfill' if args.backfill else 'pipeline' if args.pipeline else 'batch' if args.batch_images else 'sequential'
+    METRICS.write_json(metrics_path, draft=newest_draft['name'] if newest_draft else None, started_at=started_at, mode=mode,
+                       players=len(player_files), wall_seconds=round(elapsed, 3), ocr_service=bool(ocr_service),
+                       preprocess=preprocess._asdict(), argv=sys.argv[1:] if argv is None else list(argv))
+    print(f'\nSlowest stages:\n{METRICS.report()}')
+    print(f'  Metrics       -> {metrics_path}')
+
+    if profiler:
+        profile_path = args.profile or os.path.splitext(metrics_path)[0] + '.prof'
+        profiler.dump_stats(profile_path)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+        print(f'  Profile       -> {profile_path}  (python -m pstats {profile_path})')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+http_cache.py
+-------------
+Conditional GET with a local copy of every downloaded body, shared by the
+downloaders (CubeCobra card list, ManaCore archetypes/decktypes, GitHub
+tournament results).
+
+The first fetch of a URL stores the body together with its ETag / Last-Modified
+validators. Later fetches send If-None-Match / If-Modified-Since; on
+304 Not Modified the stored body is returned with `changed=False`, so callers
+can skip parsing and rewriting their outputs.
+
+Layout:
+    data/cache/http/{sha1 of url}.json   ← url, etag, last_modified
+    data/cache/http/{sha1 of url}.body   ← last 200 response body
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import requests
+
+from atomic_file import atomic_write
+
+PROJECT_ROOT   = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HTTP_CACHE_DIR = os.path.join(PROJECT_ROOT, 'data', 'cache', 'http')
+
+# content: body bytes, changed: False if the server answered 304 Not Modified
+FetchResult = namedtuple('FetchResult', ['content', 'changed', 'encoding'])
+
+
+class HTTPCache:
+    """Validators and bodies of previously fetched URLs."""
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, session=None, timeout=30):
+        self.cache_dir = cache_dir
+        self.session   = session or requests.Session()
+        self.timeout   = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        base = os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest())
+        return base + '.json', base + '.body'
+
+    def _load(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def fetch(self, url):
+        """GET `url`, conditionally if a cached copy exists. Returns a FetchResult."""
+        meta, body = self._load(url)
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        if resp.status_code == 304 and body is not None:
+            return FetchResult(body, False, meta.get('encoding') or 'utf-8')
+        resp.raise_for_status()
+
+        encoding  = resp.encoding or 'utf-8'
+        meta_path, body_path = self._paths(url)
+        with atomic_write(body_path, 'wb') as f:
+            f.write(resp.content)
+        with atomic_write(meta_path) as f:
+            json.dump({
+                'url':           url,
+                'etag':          resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified'),
+                'encoding':      encoding,
+            }, f)
+        return FetchResult(resp.content, True, encoding)
+
+    def fetch_text(self, url):
+        """(text, changed) for `url`."""
+        result = self.fetch(url)
+        return result.content.decode(result.encoding, 'replace'), result.changed
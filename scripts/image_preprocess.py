@@ -0,0 +1,107 @@
+"""
+image_preprocess.py
+-------------------
+Optional preprocessing between the downloaded photo and EasyOCR.
+
+Phone photos are 12+ megapixels while card names are a small part of them, so
+OCR time is mostly spent on pixels that do not matter. Steps, in order:
+
+    1. EXIF orientation fix     - rotate the photo the way the phone displayed it
+    2. region of interest       - crop to (left, top, right, bottom) fractions, e.g. the name column
+    3. adaptive downscaling     - shrink so the median text line is ~target_text_height px tall,
+                                  measured with EasyOCR's detector on a small probe image
+    4. grayscale
+
+OCR boxes come back in the coordinates of the prepared image; `map_to_original`
+puts them back into the (orientation-corrected) full image, so merging
+thresholds and `draw_colored_boxes` keep working in original pixels.
+For batched OCR, `pad_to_common_size` brings prepared images to one shape
+without moving any pixel.
+"""
+
+import io
+import statistics
+from collections import namedtuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+PreprocessSettings = namedtuple(
+    'PreprocessSettings',
+    ['exif_transpose', 'target_text_height', 'grayscale', 'roi', 'probe_size'],
+    defaults=[True, None, False, None, 1280],
+)
+
+# scale: prepared pixels per original pixel; offset: top-left of the crop in original pixels
+Transform = namedtuple('Transform', ['scale', 'x_offset', 'y_offset'])
+
+EXIF_ORIENTATION = 0x0112
+
+
+def load_image(photo, settings):
+    """Decode a photo given as bytes or a file path, applying the EXIF orientation if enabled."""
+    image = Image.open(io.BytesIO(photo) if isinstance(photo, (bytes, bytearray)) else photo)
+    image.load()  # decode now so no file handle stays open
+    # exif_transpose() returns a full copy even when there is nothing to rotate
+    if settings.exif_transpose and image.getexif().get(EXIF_ORIENTATION, 1) != 1:
+        image = ImageOps.exif_transpose(image)
+    return image
+
+def crop_roi(image, roi):
+    """Crop to a (left, top, right, bottom) region given as fractions of the image size."""
+    if not roi:
+        return image, (0, 0)
+    left, top, right, bottom = roi
+    box = (round(left * image.width), round(top * image.height),
+           round(right * image.width), round(bottom * image.height))
+    return image.crop(box), box[:2]
+
+def estimate_text_height(reader, image, probe_size):
+    """Median text line height in `image` pixels, from a detector pass on a thumbnail."""
+    probe_scale = min(1.0, probe_size / max(image.size))
+    probe = image if probe_scale == 1.0 else image.resize(
+        (max(1, round(image.width * probe_scale)), max(1, round(image.height * probe_scale))), Image.BILINEAR)
+    horizontal_list, _ = reader.detect(np.array(probe.convert('RGB')))
+    heights = [box[3] - box[2] for box in horizontal_list[0] if box[3] > box[2]]
+    if not heights:
+        return None
+    return statistics.median(heights) / probe_scale
+
+def prepare_for_ocr(image, settings, reader=None):
+    """Return (array for readtext, Transform back to `image` coordinates)."""
+    region, (x_offset, y_offset) = crop_roi(image, settings.roi)
+
+    scale = 1.0
+    if settings.target_text_height and reader is not None:
+        text_height = estimate_text_height(reader, region, settings.probe_size)
+        if text_height:
+            scale = min(1.0, settings.target_text_height / text_height)
+    if scale < 1.0:
+        region = region.resize((max(1, round(region.width * scale)), max(1, round(region.height * scale))), Image.LANCZOS)
+
+    mode = 'L' if settings.grayscale else 'RGB'
+    if region.mode != mode:  # convert() copies even when the mode already matches
+        region = region.convert(mode)
+    return np.array(region), Transform(scale, x_offset, y_offset)
+
+def map_to_original(ocr_results, transform):
+    """Move readtext() boxes from prepared-image pixels back to original pixels."""
+    if transform == (1.0, 0, 0):
+        return ocr_results
+    scale, x_offset, y_offset = transform
+    return [
+        ([[round(p[0] / scale + x_offset), round(p[1] / scale + y_offset)] for p in bbox], text, confidence)
+        for bbox, text, confidence in ocr_results
+    ]
+
+def pad_to_common_size(arrays, fill=255):
+    """Pad prepared arrays on the right/bottom to one shape so they can be OCRed as a batch.
+    Padding never moves existing pixels, so each image's Transform stays valid.
+    """
+    height = max(a.shape[0] for a in arrays)
+    width  = max(a.shape[1] for a in arrays)
+    padded = []
+    for a in arrays:
+        pad = ((0, height - a.shape[0]), (0, width - a.shape[1])) + ((0, 0),) * (a.ndim - 2)
+        padded.append(np.pad(a, pad, mode='constant', constant_values=fill))
+    return padded
@@ -0,0 +1,407 @@
+"""
+image_sources.py
+----------------
+Where the extractor gets its player photos from.
+
+Both backends expose the same folder tree and the same file dicts
+({'id', 'name', 'mimeType', 'modifiedTime'} plus Drive's 'md5Checksum', or the
+file 'size' for local photos, which are listed from their metadata alone and
+only hashed if their MD5 is needed):
+
+    {root}/
+    └── Season {N}/
+        └── Pictures/
+            └── {YYYYMMDD} Draft {N}/
+                ├── {Player}.jpg
+                └── ...
+
+    DriveSource        - Google Drive, rooted at config.MAIN_FOLDER_ID (the default)
+    LocalFolderSource  - the same layout on local disk, no network or credentials needed
+
+Google client libraries and config.py are only imported when a DriveSource is
+actually used, so local runs work on a machine without either.
+
+DriveSource follows nextPageToken on every listing and asks only for the fields
+it uses. The Season -> Pictures -> draft tree is resolved in three queries
+however many seasons there are (children of several folders are fetched at
+once with `'a' in parents or 'b' in parents`) and kept in
+data/cache/drive_tree.json for DRIVE_TREE_TTL seconds, which --list and
+--backfill reuse. Locating the newest draft always re-fetches the tree, so a
+draft folder created since the last run is never missed, and the files of a
+draft are always listed fresh. Pass `service=` to run it against a fake Drive client.
+
+`source.spool(file)` streams a photo to a temporary file instead of holding it
+in memory (Drive downloads go in DOWNLOAD_CHUNK_SIZE ranged chunks, each
+retried on its own, so a dropped connection resumes instead of restarting)
+and returns a SpooledPhoto: path, MD5 and size. Local photos are used in place.
+"""
+
+import abc
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from atomic_file import atomic_write
+
+PROJECT_ROOT     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOKEN_PATH       = os.path.join(PROJECT_ROOT, 'token.json')
+CREDENTIALS_PATH = os.path.join(PROJECT_ROOT, 'credentials.json')
+DRIVE_TREE_CACHE = os.path.join(PROJECT_ROOT, 'data', 'cache', 'drive_tree.json')
+DRIVE_TREE_TTL   = 10 * 60   # seconds; --refresh-tree ignores the cached tree
+
+FOLDER_MIME_TYPE  = 'application/vnd.google-apps.folder'
+FILE_FIELDS       = 'id, name, mimeType, modifiedTime, md5Checksum'
+PAGE_SIZE         = 1000
+PARENTS_PER_QUERY = 40   # keeps batched queries well below Drive's query length limit
+
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+DOWNLOAD_RETRIES    = 3   # per chunk
+HASH_CHUNK_SIZE     = 1024 * 1024
+
+SEASON_PATTERN = r'Season \d+'
+DRAFT_PATTERN  = r'\d{8}\s+Draft\s+\d+'
+
+
+def is_player_file(filename):
+    """Check if file is a player file (not an overview/backup file)."""
+    name_lower = filename.lower()
+    if '+' in filename:            return False
+    if 'result'   in name_lower:   return False
+    if 'standing' in name_lower:   return False
+    if re.search(r'^r\d', name_lower): return False
+    return True
+
+def season_number(folder):
+    return int(re.search(r'Season (\d+)', folder['name']).group(1))
+
+def draft_date(folder):
+    return int(re.match(r'(\d{8})', folder['name']).group(1))
+
+def file_md5(path):
+    """Hex MD5 of a file, read in HASH_CHUNK_SIZE chunks."""
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class SpooledPhoto:
+    """A downloaded photo on disk; `discard()` deletes it unless it is the source file itself."""
+
+    def __init__(self, path, md5=None, size=None, temporary=True):
+        self.path      = path
+        self.size      = size
+        self.temporary = temporary
+        self._md5      = md5
+
+    @property
+    def md5(self):
+        """MD5 of the file; hashed from disk on first use if the source didn't report it."""
+        if self._md5 is None:
+            self._md5 = file_md5(self.path)
+        return self._md5
+
+    def discard(self):
+        if self.temporary:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class _HashingWriter:
+    """Binary file wrapper that keeps the MD5 and length of everything written."""
+
+    def __init__(self, f):
+        self.f    = f
+        self.md5  = hashlib.md5()
+        self.size = 0
+
+    def write(self, data):
+        self.md5.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+
+class ImageSource(abc.ABC):
+    """Season -> Pictures -> draft folder walk shared by every backend."""
+
+    root_id = None
+
+    # Folder for spooled photos; None means the system temp folder
+    spool_dir = None
+
+    @abc.abstractmethod
+    def get_folders(self, parent_id, name_pattern=None):
+        """Subfolders of a folder as [{'id', 'name'}], optionally filtered by a regex on the name."""
+
+    @abc.abstractmethod
+    def get_files(self, parent_id, mime_type_filter=None):
+        """Files of a folder, sorted by name."""
+
+    @abc.abstractmethod
+    def download_to(self, file, out):
+        """Write the bytes of a file returned by get_files() to the binary file object `out`."""
+
+    def spool(self, file):
+        """Download a file to a temporary file; returns a SpooledPhoto."""
+        fd, path = tempfile.mkstemp(prefix='cubeocr-', suffix=os.path.splitext(file['name'])[1], dir=self.spool_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                out = _HashingWriter(f)
+                self.download_to(file, out)
+        except BaseException:
+            os.remove(path)
+            raise
+        return SpooledPhoto(path, out.md5.hexdigest(), out.size)
+
+    def seasons(self):
+        return self.get_folders(self.root_id, SEASON_PATTERN)
+
+    def drafts(self, season):
+        folders_in_season = self.get_folders(season['id'])
+        pictures_folder   = next((f for f in folders_in_season if f['name'].lower() == 'pictures'), None)
+        if pictures_folder is None:
+            return []
+        return self.get_folders(pictures_folder['id'], DRAFT_PATTERN)
+
+    def player_files(self, draft):
+        all_files = self.get_files(draft['id'], mime_type_filter='image/')
+        return [f for f in all_files if is_player_file(f['name'])]
+
+    def find_newest_draft(self):
+        """Return (draft_folder, player_files) for the newest draft of the newest season."""
+        print(f'Locating newest draft on {self.describe()}...')
+        newest_season = max(self.seasons(), key=season_number)
+        print(f'  Season  : {newest_season["name"]}')
+
+        newest_draft = max(self.drafts(newest_season), key=draft_date)
+        newest_draft['season'] = newest_season['name']
+        print(f'  Draft   : {newest_draft["name"]}')
+
+        player_files = self.player_files(newest_draft)
+        print(f'  Players : {len(player_files)} image(s) found\n')
+        return newest_draft, player_files
+
+    def describe(self):
+        return type(self).__name__
+
+
+class DriveSource(ImageSource):
+    """Google Drive backend; authenticates on first use."""
+
+    def __init__(self, root_id=None, service=None, tree_cache=DRIVE_TREE_CACHE, tree_ttl=DRIVE_TREE_TTL):
+        self._root_id    = root_id
+        self._service    = service
+        self._local      = threading.local()
+        self._creds      = None
+        self._lock       = threading.Lock()
+        self._tree       = None
+        self.tree_cache  = tree_cache
+        self.tree_ttl    = tree_ttl
+
+    def describe(self):
+        return 'Google Drive'
+
+    @property
+    def root_id(self):
+        if self._root_id is None:
+            sys.path.insert(0, PROJECT_ROOT)
+            from config import MAIN_FOLDER_ID
+            self._root_id = MAIN_FOLDER_ID
+        return self._root_id
+
+    def credentials(self):
+        """Load token.json, or run the OAuth browser flow once and save it."""
+        with self._lock:
+            if self._creds is None:
+                from google.oauth2.credentials import Credentials
+                from google_auth_oauthlib.flow import InstalledAppFlow
+                sys.path.insert(0, PROJECT_ROOT)
+                from config import SCOPES
+
+                if os.path.exists(TOKEN_PATH):
+                    creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+                else:
+                    flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_PATH, SCOPES)
+                    creds = flow.run_local_server(port=0)
+                    with open(TOKEN_PATH, 'w') as token:
+                        token.write(creds.to_json())
+                self._creds = creds
+            return self._creds
+
+    def service(self):
+        """Drive client for the current thread (the underlying httplib2 client is not thread-safe)."""
+        if self._service is not None:
+            return self._service
+        if not hasattr(self._local, 'service'):
+            from googleapiclient.discovery import build
+            self._local.service = build('drive', 'v3', credentials=self.credentials())
+        return self._local.service
+
+    # --- Listing ---
+    def list_files(self, query, fields):
+        """Every file matching a Drive query, following nextPageToken."""
+        files, page_token = [], None
+        while True:
+            response = self.service().files().list(
+                q=query, fields=f'nextPageToken, files({fields})', pageSize=PAGE_SIZE, pageToken=page_token,
+            ).execute()
+            files.extend(response.get('files', []))
+            page_token = response.get('nextPageToken')
+            if not page_token:
+                return files
+
+    def children(self, parent_ids, folders_only=False, mime_type_filter=None, fields='id, name'):
+        """{parent_id: [non-trashed children]} of several folders, PARENTS_PER_QUERY folders per query."""
+        parent_ids = list(dict.fromkeys(parent_ids))
+        children   = {parent_id: [] for parent_id in parent_ids}
+        for start in range(0, len(parent_ids), PARENTS_PER_QUERY):
+            chunk = parent_ids[start:start + PARENTS_PER_QUERY]
+            query = '(' + ' or '.join(f"'{parent_id}' in parents" for parent_id in chunk) + ') and trashed=false'
+            if folders_only:
+                query += f" and mimeType='{FOLDER_MIME_TYPE}'"
+            if mime_type_filter:
+                query += f" and mimeType contains '{mime_type_filter}'"
+            for file in self.list_files(query, f'{fields}, parents'):
+                for parent_id in file.pop('parents', []):
+                    if parent_id in children:
+                        children[parent_id].append(file)
+        return children
+
+    def get_folders(self, parent_id, name_pattern=None):
+        """Get non-trashed folders from a parent folder."""
+        folders = self.children([parent_id], folders_only=True)[parent_id]
+        if name_pattern:
+            folders = [f for f in folders if re.search(name_pattern, f['name'])]
+        return folders
+
+    def get_files(self, parent_id, mime_type_filter=None):
+        """Get non-trashed files from a folder, sorted by name."""
+        files = self.children([parent_id], mime_type_filter=mime_type_filter, fields=FILE_FIELDS)[parent_id]
+        return sorted(files, key=lambda x: x['name'])
+
+    # --- Folder tree ---
+    def folder_tree(self):
+        """[{'id', 'name', 'drafts': [{'id', 'name'}]}] for every season, from the cache while it is fresh."""
+        if self._tree is None:
+            self._tree = self._load_tree()
+        if self._tree is None:
+            self.refresh_tree()
+        return self._tree
+
+    def refresh_tree(self):
+        """Re-list the folder tree from Drive and update the cache."""
+        self._tree = self._fetch_tree()
+        self._save_tree(self._tree)
+
+    def find_newest_draft(self):
+        # A draft folder may have been created since the tree was cached
+        self.refresh_tree()
+        return super().find_newest_draft()
+
+    def _fetch_tree(self):
+        """Seasons, their Pictures folders and the drafts in those: three queries (per PARENTS_PER_QUERY seasons)."""
+        seasons  = self.get_folders(self.root_id, SEASON_PATTERN)
+        contents = self.children([s['id'] for s in seasons], folders_only=True)
+        pictures = {s['id']: next((f['id'] for f in contents[s['id']] if f['name'].lower() == 'pictures'), None)
+                    for s in seasons}
+        drafts   = self.children([p for p in pictures.values() if p], folders_only=True)
+        return [{
+            'id':     s['id'],
+            'name':   s['name'],
+            'drafts': sorted(({'id': d['id'], 'name': d['name']} for d in drafts.get(pictures[s['id']], [])
+                              if re.search(DRAFT_PATTERN, d['name'])), key=lambda d: d['name']),
+        } for s in sorted(seasons, key=lambda s: s['name'])]
+
+    def _load_tree(self):
+        if not self.tree_ttl or not self.tree_cache or not os.path.exists(self.tree_cache):
+            return None
+        try:
+            with open(self.tree_cache, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached['root_id'] != self.root_id or time.time() - cached['fetched_at'] > self.tree_ttl:
+                return None
+            return list(cached['seasons'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None   # unreadable or corrupt cache: fetch the tree again
+
+    def _save_tree(self, tree):
+        if not self.tree_cache:
+            return
+        os.makedirs(os.path.dirname(self.tree_cache), exist_ok=True)
+        with atomic_write(self.tree_cache) as f:
+            json.dump({'root_id': self.root_id, 'fetched_at': time.time(), 'seasons': tree}, f, indent=2)
+
+    def seasons(self):
+        return [{'id': s['id'], 'name': s['name']} for s in self.folder_tree()]
+
+    def drafts(self, season):
+        season = next(s for s in self.folder_tree() if s['id'] == season['id'])
+        return [dict(d) for d in season['drafts']]
+
+    def download_to(self, file, out):
+        """Stream a file from Google Drive in ranged chunks, retrying each chunk on its own."""
+        from googleapiclient.http import MediaIoBaseDownload
+        request    = self.service().files().get_media(fileId=file['id'])
+        downloader = MediaIoBaseDownload(out, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk(num_retries=DOWNLOAD_RETRIES)
+
+
+class LocalFolderSource(ImageSource):
+    """Local copy of the Drive layout; folder and file ids are absolute paths."""
+
+    def __init__(self, root):
+        self.root_id = os.path.abspath(root)
+        if not os.path.isdir(self.root_id):
+            raise FileNotFoundError(f'Local image folder not found: {self.root_id}')
+
+    def describe(self):
+        return self.root_id
+
+    def get_folders(self, parent_id, name_pattern=None):
+        folders = [
+            {'id': entry.path, 'name': entry.name}
+            for entry in os.scandir(parent_id)
+            if entry.is_dir() and not entry.name.startswith('.')
+        ]
+        if name_pattern:
+            folders = [f for f in folders if re.search(name_pattern, f['name'])]
+        return sorted(folders, key=lambda x: x['name'])
+
+    def get_files(self, parent_id, mime_type_filter=None):
+        files = []
+        for entry in os.scandir(parent_id):
+            if not entry.is_file() or entry.name.startswith('.'):
+                continue
+            mime_type = mimetypes.guess_type(entry.name)[0] or 'application/octet-stream'
+            if mime_type_filter and mime_type_filter not in mime_type:
+                continue
+            stat = entry.stat()
+            files.append({
+                'id':           entry.path,
+                'name':         entry.name,
+                'mimeType':     mime_type,
+                'modifiedTime': datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+                'size':         stat.st_size,
+            })
+        return sorted(files, key=lambda x: x['name'])
+
+    def download_to(self, file, out):
+        with open(file['id'], 'rb') as f:
+            shutil.copyfileobj(f, out, HASH_CHUNK_SIZE)
+
+    def spool(self, file):
+        """Local photos are already on disk: no copy, and no hashing unless the MD5 is asked for."""
+        return SpooledPhoto(file['id'], size=os.path.getsize(file['id']), temporary=False)
@@ -0,0 +1,96 @@
+"""
+metrics.py
+----------
+Lightweight timers and counters for the OCR pipeline.
+
+    from metrics import METRICS
+    with METRICS.timer('readtext'):
+        ...
+    METRICS.count('ocr_cache.hit')
+
+`METRICS.write_json(path, **run_info)` stores per-stage call counts, total /
+mean / p50 / p95 / max seconds and all counters, so runs on different drafts
+can be compared. Timers are thread-safe; work done inside OCR worker
+processes is only visible as the time the parent waited for it.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from atomic_file import atomic_write
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Metrics:
+    def __init__(self):
+        self.timings  = defaultdict(list)
+        self.counters = Counter()
+        self._lock    = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.timings.clear()
+            self.counters.clear()
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.timings[name].append(seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    @contextmanager
+    def timer(self, name):
+        """Time the enclosed block under `name` (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def summary(self):
+        """{'timings': {name: stats}, 'counters': {name: n}}, timings ordered by total time."""
+        with self._lock:
+            timings  = {name: sorted(values) for name, values in self.timings.items()}
+            counters = dict(self.counters)
+        stats = {}
+        for name, values in sorted(timings.items(), key=lambda kv: -sum(kv[1])):
+            total = sum(values)
+            stats[name] = {
+                'calls': len(values),
+                'total': round(total, 6),
+                'mean':  round(total / len(values), 6),
+                'p50':   round(percentile(values, 50), 6),
+                'p95':   round(percentile(values, 95), 6),
+                'max':   round(values[-1], 6),
+            }
+        return {'timings': stats, 'counters': dict(sorted(counters.items()))}
+
+    def report(self, top=12):
+        """Human-readable table of the slowest stages."""
+        lines = [f'  {"stage":<28} {"calls":>6} {"total s":>9} {"mean ms":>9} {"p95 ms":>9}']
+        for name, s in list(self.summary()['timings'].items())[:top]:
+            lines.append(f'  {name:<28} {s["calls"]:>6} {s["total"]:>9.2f} {s["mean"] * 1000:>9.1f} {s["p95"] * 1000:>9.1f}')
+        return '\n'.join(lines)
+
+    def write_json(self, path, **run_info):
+        """Write run_info plus summary() atomically to `path`."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)   # a bare file name goes to the current folder
+        with atomic_write(path) as f:
+            json.dump({**run_info, **self.summary()}, f, indent=2, ensure_ascii=False)
+
+
+# Process-wide registry used by the extractor
+METRICS = Metrics()
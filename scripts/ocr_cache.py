@@ -0,0 +1,103 @@
+"""
+ocr_cache.py
+------------
+Persistent on-disk cache of raw EasyOCR `readtext` detections.
+
+Entries are keyed by the image's MD5 (the same value Google Drive reports as
+`md5Checksum`) plus a fingerprint of the OCR settings, so a cached result is
+only reused for the same photo read the same way. Only the neural OCR output is
+stored: merging, validation and thresholds are re-run on every hit.
+
+Layout:
+    data/ocr_cache/{md5}-{settings fingerprint}.json
+
+When the folder grows past `max_bytes`, the least recently used entries (by
+mtime, which is refreshed on every hit) are deleted.
+"""
+
+import hashlib
+import json
+import os
+
+from atomic_file import atomic_write
+
+
+def image_md5(image_bytes):
+    """Hex MD5 of the raw image file, comparable to Drive's md5Checksum."""
+    return hashlib.md5(image_bytes).hexdigest()
+
+
+def _plain(value):
+    """Turn numpy scalars (as returned by EasyOCR) into JSON-serializable Python values."""
+    return value.item() if hasattr(value, 'item') else value
+
+def detections_to_json(detections):
+    """readtext() output as nested lists of plain Python values."""
+    return [
+        [[[_plain(v) for v in point] for point in bbox], text, _plain(confidence)]
+        for bbox, text, confidence in detections
+    ]
+
+def detections_from_json(data):
+    """Inverse of detections_to_json(): [(bbox, text, confidence)]."""
+    return [(bbox, text, confidence) for bbox, text, confidence in data]
+
+
+class OCRCache:
+    """Content-addressed store of readtext() results."""
+
+    def __init__(self, cache_dir, settings, max_bytes=50 * 1024 * 1024):
+        self.cache_dir   = cache_dir
+        self.max_bytes   = max_bytes
+        self.fingerprint = hashlib.sha1(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        self.hits        = 0
+        self.misses      = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, image_bytes=None, md5=None):
+        """Cache key for an image, from its bytes or a precomputed MD5."""
+        return f'{md5 or image_md5(image_bytes)}-{self.fingerprint}'
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, key):
+        """Return cached detections as [(bbox, text, confidence)], or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return detections_from_json(data)
+
+    def put(self, key, detections):
+        """Store detections atomically, then evict old entries if over budget."""
+        data = detections_to_json(detections)
+        with atomic_write(self._path(key)) as f:
+            json.dump(data, f, ensure_ascii=False)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total   = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,106 @@
+"""
+ocr_merge.py
+------------
+Turns raw EasyOCR detections into one entry per card name.
+
+EasyOCR often splits a card name into several boxes ("Lightning" + "Bolt").
+Detections whose boxes sit on the same line and close together are grouped
+into connected components and joined left to right.
+
+Adjacency is found with a sweep over the boxes sorted by their top edge, so
+only boxes in the same horizontal band are compared, and each group is grown
+lowest index first, which reproduces the order of the original rescanning loop
+exactly (the order decides text joins on x ties and the confidence average).
+"""
+
+import heapq
+
+
+def bbox_extent(bbox):
+    """Axis-aligned (x_min, x_max, y_min, y_max) of a bounding box."""
+    xs = [p[0] for p in bbox]
+    ys = [p[1] for p in bbox]
+    return min(xs), max(xs), min(ys), max(ys)
+
+def extents_are_adjacent(extent1, extent2, max_x_distance=30, max_y_distance=10):
+    """boxes_are_adjacent() on precomputed extents."""
+    x1_min, x1_max, y1_min, y1_max = extent1
+    x2_min, x2_max, y2_min, y2_max = extent2
+    y_overlap      = not (y1_max < y2_min - max_y_distance or y2_max < y1_min - max_y_distance)
+    horizontal_gap = min(abs(x1_max - x2_min), abs(x2_max - x1_min))
+    return y_overlap and horizontal_gap <= max_x_distance
+
+def boxes_are_adjacent(bbox1, bbox2, max_x_distance=30, max_y_distance=10):
+    """Check if two bounding boxes are close enough to be the same card name."""
+    return extents_are_adjacent(bbox_extent(bbox1), bbox_extent(bbox2), max_x_distance, max_y_distance)
+
+def adjacency_lists(extents, max_x_distance=30, max_y_distance=10):
+    """Neighbour indices of every box, comparing only boxes whose rows overlap."""
+    order      = sorted(range(len(extents)), key=lambda i: extents[i][2])
+    neighbours = [[] for _ in extents]
+    for pos, i in enumerate(order):
+        extent_i = extents[i]
+        y_max    = extent_i[3]
+        for j in order[pos + 1:]:
+            # Boxes are sorted by top edge, so every later box starts lower still
+            if y_max < extents[j][2] - max_y_distance:
+                break
+            if extents_are_adjacent(extent_i, extents[j], max_x_distance, max_y_distance):
+                neighbours[i].append(j)
+                neighbours[j].append(i)
+    return neighbours
+
+def merge_bboxes(bboxes):
+    """Merge multiple bounding boxes into one encompassing box."""
+    all_x = [p[0] for bbox in bboxes for p in bbox]
+    all_y = [p[1] for bbox in bboxes for p in bbox]
+    return [(min(all_x), min(all_y)), (max(all_x), min(all_y)),
+            (max(all_x), max(all_y)), (min(all_x), max(all_y))]
+
+def should_keep_text(text):
+    """Filter out noise: short strings, mana symbols, UI labels, etc."""
+    if len(text) < 3 or len(text) > 50:  return False
+    if not any(c.isalpha() for c in text): return False
+    if text.lower() in ['tap', 'untap', 'mana', 'cost', 'main', 'deck', 'sideboard']: return False
+    if all(c.isdigit() or c in '{}/WUBRGC' for c in text): return False
+    return True
+
+def parse_and_merge_card_names(ocr_results):
+    """Group adjacent OCR detections into single card names, sorted top to bottom."""
+    filtered = []
+    extents  = []
+    for bbox, text, confidence in ocr_results:
+        if confidence < 0.05: continue
+        text = text.strip()
+        if not should_keep_text(text): continue
+        extent = bbox_extent(bbox)
+        extents.append(extent)
+        filtered.append({
+            'bbox': bbox, 'text': text, 'confidence': confidence,
+            'x_min': extent[0], 'y_position': bbox[0][1]
+        })
+
+    neighbours   = adjacency_lists(extents)
+    merged_cards = []
+    used = set()
+    for i in range(len(filtered)):
+        if i in used: continue
+        # Always take the lowest-index detection touching the group next
+        group    = []
+        frontier = [i]; used.add(i)
+        while frontier:
+            k = heapq.heappop(frontier)
+            group.append(filtered[k])
+            for j in neighbours[k]:
+                if j not in used:
+                    used.add(j); heapq.heappush(frontier, j)
+        group.sort(key=lambda x: x['x_min'])
+        merged_cards.append({
+            'text':       ' '.join(d['text'] for d in group),
+            'confidence': sum(d['confidence'] for d in group) / len(group),
+            'bbox':       merge_bboxes([d['bbox'] for d in group]),
+            'y_position': group[0]['y_position']
+        })
+
+    merged_cards.sort(key=lambda x: x['y_position'])
+    return merged_cards
@@ -0,0 +1,214 @@
+"""
+ocr_service.py
+--------------
+Long-lived local OCR worker that keeps an EasyOCR reader warm.
+
+Every extractor run otherwise reloads the EasyOCR weights from disk. Start the
+service once and point the extractor (or any other tool) at it:
+
+    python scripts/ocr_service.py [--port 8765] [--concurrency 1] [--max-queue 16] [--cpu]
+    python scripts/extractor_and_OCR.py --ocr-service
+
+HTTP API (localhost only by default):
+    GET  /health   -> {"status": "ok", "running": n, "waiting": n, "served": n, ...,
+                       "engine": {"easyocr": version, "languages": [...]}}
+    POST /ocr      body: raw image bytes
+                   header X-OCR-Preprocess: JSON of image_preprocess.PreprocessSettings (optional)
+                   -> {"detections": [[bbox, text, confidence], ...], "seconds": t}
+
+At most `--concurrency` images are OCRed at once; up to `--max-queue` more
+wait their turn, and anything beyond that gets 503 with Retry-After so clients
+back off instead of piling up. A refused request's body is never read into
+memory: the connection is closed after the answer, and only bodies up to
+DRAIN_LIMIT are read off the socket (and dropped) first so the client gets to
+see the 503 rather than a reset connection, which it retries the same way.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ocr_cache import detections_to_json, detections_from_json
+
+DEFAULT_HOST      = '127.0.0.1'
+DEFAULT_PORT      = 8765
+DEFAULT_URL       = f'http://{DEFAULT_HOST}:{DEFAULT_PORT}'
+PREPROCESS_HEADER = 'X-OCR-Preprocess'
+MAX_RETRIES       = 5
+DRAIN_LIMIT       = 8 * 1024 * 1024   # bytes of a refused request still read off the socket
+DRAIN_CHUNK_SIZE  = 64 * 1024
+
+
+class OCRServiceError(RuntimeError):
+    pass
+
+
+# --- Client ---
+class OCRServiceClient:
+    """Submit images to a running ocr_service.py."""
+
+    def __init__(self, url=DEFAULT_URL, timeout=600):
+        self.url     = url.rstrip('/')
+        self.timeout = timeout
+
+    def health(self):
+        """The service's /health answer, or None if no service answers it within a second."""
+        try:
+            with urllib.request.urlopen(f'{self.url}/health', timeout=1) as resp:
+                health = json.load(resp)
+        except (OSError, ValueError):
+            return None
+        return health if health.get('status') == 'ok' else None
+
+    def readtext(self, photo, preprocess=None):
+        """Same result as extract_text_from_image(photo, preprocess=preprocess)[1].
+        `photo` is the image bytes or the path of the image file, which is streamed from disk.
+        """
+        headers = {'Content-Type': 'application/octet-stream'}
+        if preprocess is not None:
+            headers[PREPROCESS_HEADER] = json.dumps(preprocess._asdict())
+        is_path = not isinstance(photo, (bytes, bytearray))
+        headers['Content-Length'] = str(os.path.getsize(photo) if is_path else len(photo))
+        for attempt in range(1, MAX_RETRIES + 1):
+            try:
+                with open(photo, 'rb') if is_path else nullcontext(photo) as body:
+                    request = urllib.request.Request(f'{self.url}/ocr', data=body, headers=headers, method='POST')
+                    with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+                        return detections_from_json(json.load(resp)['detections'])
+            except urllib.error.HTTPError as e:
+                if e.code != 503 or attempt == MAX_RETRIES:
+                    raise OCRServiceError(f'OCR service returned {e.code}: {e.read().decode("utf-8", "replace")}') from e
+                time.sleep(float(e.headers.get('Retry-After', attempt)))
+            except urllib.error.URLError as e:
+                # A full service may drop a large upload without reading it
+                if not isinstance(e.reason, (ConnectionResetError, BrokenPipeError)) or attempt == MAX_RETRIES:
+                    raise
+                time.sleep(attempt)
+
+
+# --- Server ---
+class OCRServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, reader, concurrency, max_queue, engine=None):
+        super().__init__(address, OCRRequestHandler)
+        self.reader    = reader
+        self.ocr_slots = threading.BoundedSemaphore(concurrency)
+        self.admitted  = threading.BoundedSemaphore(concurrency + max_queue)
+        self.lock      = threading.Lock()
+        self.stats     = {'status': 'ok', 'running': 0, 'waiting': 0, 'served': 0, 'rejected': 0,
+                          'concurrency': concurrency, 'max_queue': max_queue, 'engine': engine}
+
+    def count(self, key, delta):
+        with self.lock:
+            self.stats[key] += delta
+
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'CubeOCR/1'
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _refuse(self, status, payload, headers=None):
+        """Answer without reading the body, then close the connection (see the module docstring)."""
+        self.close_connection = True
+        self._send_json(status, payload, {**(headers or {}), 'Connection': 'close'})
+        remaining = int(self.headers.get('Content-Length') or 0)
+        if remaining > DRAIN_LIMIT:
+            return
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, DRAIN_CHUNK_SIZE))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._send_json(404, {'error': 'not found'})
+        with self.server.lock:
+            stats = dict(self.server.stats)
+        self._send_json(200, stats)
+
+    def do_POST(self):
+        if self.path != '/ocr':
+            return self._refuse(404, {'error': 'not found'})
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return self._send_json(400, {'error': 'empty body, expected image bytes'})
+
+        from image_preprocess import PreprocessSettings
+        try:
+            settings = json.loads(self.headers.get(PREPROCESS_HEADER) or '{}')
+            if settings.get('roi'):
+                settings['roi'] = tuple(settings['roi'])
+            preprocess = PreprocessSettings(**settings)
+        except (ValueError, TypeError) as e:
+            return self._refuse(400, {'error': f'bad {PREPROCESS_HEADER}: {e}'})
+
+        # Admission is decided on the headers alone, so a full queue costs no upload
+        if not self.server.admitted.acquire(blocking=False):
+            self.server.count('rejected', 1)
+            return self._refuse(503, {'error': 'queue full'}, {'Retry-After': '2'})
+        try:
+            image_bytes = self.rfile.read(length)
+            self.server.count('waiting', 1)
+            with self.server.ocr_slots:
+                self.server.count('waiting', -1)
+                self.server.count('running', 1)
+                try:
+                    import extractor_and_OCR as extractor
+                    start = time.perf_counter()
+                    _, detections = extractor.extract_text_from_image(image_bytes, self.server.reader, preprocess)
+                    seconds = time.perf_counter() - start
+                finally:
+                    self.server.count('running', -1)
+        except Exception as e:
+            return self._send_json(500, {'error': str(e)})
+        finally:
+            self.server.admitted.release()
+
+        self.server.count('served', 1)
+        self._send_json(200, {'detections': detections_to_json(detections), 'seconds': seconds})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve EasyOCR from a warm reader on localhost.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--concurrency', type=int, default=1, help='images OCRed at the same time (default: 1)')
+    parser.add_argument('--max-queue', type=int, default=16, help='requests allowed to wait before 503 (default: 16)')
+    parser.add_argument('--cpu', action='store_true', help='run EasyOCR on CPU')
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import extractor_and_OCR as extractor
+    reader = extractor.get_reader(gpu=not args.cpu and extractor.OCR_GPU)
+
+    server = OCRServer((args.host, args.port), reader, args.concurrency, args.max_queue, extractor.ocr_engine())
+    print(f'OCR service listening on http://{args.host}:{args.port} '
+          f'(concurrency {args.concurrency}, queue {args.max_queue})')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+player_output.py
+----------------
+Single-pass, crash-safe writer for one player's extractor outputs.
+
+    with PlayerOutput(player_name, dirs, scryfall_ids) as out:
+        for card in merged_cards:          # validated one at a time
+            out.add(card)
+    out.summary()
+
+Each validated card is streamed to the three CSVs at once while the status
+counts are kept, instead of walking the card list once per count and per file:
+
+    data/drafted_decks/{draft}/{player}.csv                    ← raw OCR names
+    data/drafted_decks/{draft}/detailed OCR/detailed_{player}.csv
+    data/clean/{draft}/clean_{player}.csv                      ← matched names + Scryfall IDs
+
+Rows go to temporary files next to their targets (atomic_file.AtomicFile),
+which only replace the previous outputs (os.replace) when the block finishes
+without an exception, so a crash never leaves a half-written CSV behind.
+"""
+
+import csv
+import os
+from collections import Counter
+
+from atomic_file import AtomicFile, atomic_write
+
+MATCHED_STATUSES = ('exact', 'exact_corrected', 'fuzzy')
+
+
+def save_image_atomic(image, path, **save_kwargs):
+    """PIL image.save() to a temp file, then rename over `path`."""
+    with atomic_write(path, 'wb') as f:
+        image.save(f, format='JPEG', **save_kwargs)
+
+
+class PlayerOutput:
+    """Raw, detailed and clean CSVs of one player, written in one pass and committed atomically."""
+
+    def __init__(self, player_name, dirs, scryfall_ids):
+        self.scryfall_ids = scryfall_ids
+        self.counts       = Counter()
+        self.paths = {
+            'raw':      os.path.join(dirs['output_dir'], f'{player_name}.csv'),
+            'detailed': os.path.join(dirs['detailed_dir'], f'detailed_{player_name}.csv'),
+            'clean':    os.path.join(dirs['clean_dir'], f'clean_{player_name}.csv'),
+        }
+        self._targets = {}
+        self._writers = {}
+
+    def __enter__(self):
+        try:
+            for key, path in self.paths.items():
+                self._targets[key] = AtomicFile(path)
+                self._writers[key] = csv.writer(self._targets[key].file)
+        except BaseException:
+            self._discard()
+            raise
+        self._writers['raw'].writerow(['name'])
+        self._writers['detailed'].writerow(['status', 'official_name', 'ocr_input', 'note'])
+        self._writers['clean'].writerow(['name', 'scryfall_id'])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._discard()
+            return False
+        try:
+            for key in self.paths:
+                self._targets.pop(key).commit()
+        except BaseException:
+            self._discard()
+            raise
+        return False
+
+    def _discard(self):
+        for target in self._targets.values():
+            target.discard()
+        self._targets.clear()
+
+    def add(self, card):
+        """Write one validated card ({'text', 'status', 'official_name'}) to all three CSVs."""
+        s     = card['status']
+        oname = card['official_name'] or ''
+        ocr   = card['text']
+        self.counts[s] += 1
+
+        # Raw OCR CSV (unvalidated)
+        self._writers['raw'].writerow([ocr])
+
+        # Detailed validation CSV
+        if s in ('exact', 'exact_corrected'):
+            self._writers['detailed'].writerow(['exact',     oname, ocr, ''])
+        elif s == 'fuzzy':
+            self._writers['detailed'].writerow(['corrected', oname, ocr, f'corrected from: {ocr}'])
+        elif s == 'unmatched':
+            self._writers['detailed'].writerow(['unmatched', '',    ocr, 'no match found'])
+        elif s == 'duplicate':
+            self._writers['detailed'].writerow(['duplicate', oname, ocr, 'duplicate removed'])
+
+        # Clean deck list
+        if s in MATCHED_STATUSES:
+            self._writers['clean'].writerow([oname, self.scryfall_ids.get(oname, '')])
+
+    def summary(self):
+        c = self.counts
+        return (f'{sum(c.values())} detections: {c["exact"] + c["exact_corrected"]} exact, {c["fuzzy"]} corrected, '
+                f'{c["unmatched"]} unmatched, {c["duplicate"]} duplicates')
@@ -0,0 +1,195 @@
+"""
+scryfall_client.py
+------------------
+Concurrent, rate-limited client for Scryfall's /cards/collection endpoint.
+
+- One pooled requests.Session shared by all worker threads (connection reuse)
+- A token bucket keeps the request rate under Scryfall's limit
+  (10 requests/second, https://scryfall.com/docs/api/rate-limits)
+- Batches of 75 identifiers are sent from a thread pool
+- Timeouts, connection errors, 429 and 5xx are retried with exponential
+  backoff plus jitter; identifiers whose batch still fails are regrouped and
+  retried in a second round, so only failed identifiers are re-sent
+
+The API root can be overridden (SCRYFALL_API environment variable or
+`base_url`) to run against a local stub server.
+
+ScryfallIDCache keeps every ID already looked up in a small SQLite file, so a
+re-run only asks Scryfall about printings it has not seen before.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SCRYFALL_API      = os.environ.get('SCRYFALL_API', 'https://api.scryfall.com')
+BATCH_SIZE        = 75
+REQUESTS_PER_SEC  = 10
+MAX_WORKERS       = 4
+MAX_RETRIES       = 5
+RETRY_ROUNDS      = 2
+BACKOFF_BASE      = 0.5
+BACKOFF_MAX       = 30
+RETRY_STATUS      = {429, 500, 502, 503, 504}
+HEADERS           = {'User-Agent': 'CubeOCR/1.0', 'Accept': 'application/json'}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate      = rate
+        self.capacity  = capacity
+        self.tokens    = capacity
+        self.updated   = time.monotonic()
+        self.lock      = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now          = time.monotonic()
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with full jitter; honours a server-sent Retry-After."""
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class ScryfallClient:
+    def __init__(self, base_url=SCRYFALL_API, requests_per_sec=REQUESTS_PER_SEC, max_workers=MAX_WORKERS,
+                 max_retries=MAX_RETRIES, timeout=30):
+        self.base_url    = base_url.rstrip('/')
+        self.bucket      = TokenBucket(requests_per_sec)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.timeout     = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _post_batch(self, batch):
+        """POST one batch, retrying transient failures. Returns the response JSON or raises."""
+        url = f'{self.base_url}/cards/collection'
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            try:
+                resp = self.session.post(url, json={'identifiers': batch}, timeout=self.timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            if resp.status_code in RETRY_STATUS and attempt < self.max_retries - 1:
+                time.sleep(backoff_delay(attempt, resp.headers.get('Retry-After')))
+                continue
+            resp.raise_for_status()
+            return resp.json()
+
+    def fetch_collection(self, identifiers, progress=print):
+        """Look up identifiers in batches of 75.
+        Returns (cards, not_found, failed): card objects, identifiers Scryfall does not know,
+        and identifiers whose requests kept failing.
+        """
+        cards, not_found = [], []
+        pending = list(identifiers)
+        for round_no in range(1, RETRY_ROUNDS + 1):
+            if not pending:
+                break
+            batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+            if round_no > 1:
+                progress(f'  Retrying {len(pending)} failed identifier(s) in {len(batches)} batch(es)...')
+            failed = []
+            with ThreadPoolExecutor(self.max_workers) as pool:
+                futures = {pool.submit(self._post_batch, batch): batch for batch in batches}
+                for done, future in enumerate(as_completed(futures), 1):
+                    batch = futures[future]
+                    try:
+                        data = future.result()
+                    except requests.exceptions.RequestException as e:
+                        progress(f'  Batch {done}/{len(batches)} FAILED: {e}')
+                        failed.extend(batch)
+                        continue
+                    cards.extend(data.get('data', []))
+                    not_found.extend(data.get('not_found', []))
+                    progress(f'  Batch {done}/{len(batches)} done ({len(cards)} found so far)')
+            pending = failed
+        return cards, not_found, pending
+
+
+class ScryfallIDCache:
+    """Persistent map of set|collector_number and name|card name -> Scryfall ID.
+
+    A printing's Scryfall ID never changes, so entries are never expired.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS scryfall_ids (key TEXT PRIMARY KEY, scryfall_id TEXT NOT NULL)')
+        self.ids  = dict(self.conn.execute('SELECT key, scryfall_id FROM scryfall_ids'))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def card_key(card):
+        """Cache key for a cube card: its printing if known, else its name."""
+        if card['set'] and card['collector_number']:
+            return f"{card['set']}|{card['collector_number']}"
+        return f"name|{card['name']}"
+
+    def get(self, key):
+        return self.ids.get(key)
+
+    def lookup(self, card):
+        """Scryfall ID of a cube card by its printing, falling back to its name."""
+        return self.get(self.card_key(card)) or self.get(f"name|{card['name']}")
+
+    def add(self, scryfall_cards):
+        """Store Scryfall card objects under their printing and (front-face) name."""
+        rows = []
+        for card in scryfall_cards:
+            front_name = card['name'].split(' // ')[0].strip()
+            rows.append((f"{card['set']}|{card['collector_number']}", card['id']))
+            rows.append((f'name|{front_name}', card['id']))
+            rows.append((f"name|{card['name']}", card['id']))
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO scryfall_ids (key, scryfall_id) VALUES (?, ?)', rows)
+        self.ids.update(rows)
@@ -0,0 +1,223 @@
+"""
+test_http_clients.py
+--------------------
+HTTPCache and ScryfallClient against a local http.server stub, no network needed.
+
+    python -m unittest discover tests
+
+HTTPCache: the validators of a 200 are sent back, a 304 returns the stored body
+unchanged, a new body replaces it, and a lost or corrupt cache entry falls
+back to a plain GET. ScryfallClient: batches of 75, 429 honouring
+Retry-After, and a second round that only re-sends the identifiers whose
+batch kept failing. ScryfallIDCache: a printing resolved only by name is found
+again without asking Scryfall.
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+import scryfall_client
+from http_cache import HTTPCache
+from scryfall_client import ScryfallClient, ScryfallIDCache
+
+
+class StubServer:
+    """ThreadingHTTPServer on a free local port; `handle(handler) -> (status, headers, body)` answers each request."""
+
+    def __init__(self, handle):
+        self.requests = []   # (method, path, headers, parsed JSON body or None)
+        self.lock     = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body   = json.loads(self.rfile.read(length)) if length else None
+                with stub.lock:
+                    stub.requests.append((self.command, self.path, dict(self.headers), body))
+                status, headers, payload = handle(self, body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url    = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class HTTPCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.body = b'name,set\nLightning Bolt,lea\n'
+        self.etag = '"v1"'
+        self.stub = StubServer(self.handle)
+        self.dir  = tempfile.mkdtemp()
+        self.cache = HTTPCache(self.dir)
+        self.url  = f'{self.stub.url}/cube.csv'
+
+    def tearDown(self):
+        self.cache.session.close()
+        self.stub.close()
+        shutil.rmtree(self.dir)
+
+    def handle(self, request, _):
+        if request.headers.get('If-None-Match') == self.etag:
+            return 304, {'ETag': self.etag}, b''
+        return 200, {'ETag': self.etag, 'Last-Modified': 'Sat, 01 Mar 2026 10:00:00 GMT',
+                     'Content-Type': 'text/csv; charset=utf-8'}, self.body
+
+    def sent_headers(self):
+        return [headers for _, _, headers, _ in self.stub.requests]
+
+    def test_validators_round_trip_and_304(self):
+        first = self.cache.fetch(self.url)
+        self.assertTrue(first.changed)
+        self.assertEqual(first.content, self.body)
+        self.assertNotIn('If-None-Match', self.sent_headers()[0])
+
+        second = self.cache.fetch(self.url)
+        self.assertFalse(second.changed)
+        self.assertEqual(second.content, self.body)
+        self.assertEqual(self.sent_headers()[1].get('If-None-Match'), self.etag)
+        self.assertEqual(self.sent_headers()[1].get('If-Modified-Since'), 'Sat, 01 Mar 2026 10:00:00 GMT')
+
+        text, changed = self.cache.fetch_text(self.url)
+        self.assertEqual((text, changed), (self.body.decode('utf-8'), False))
+
+    def test_changed_body_replaces_cached_copy(self):
+        self.cache.fetch(self.url)
+        self.body, self.etag = b'name,set\nCounterspell,lea\n', '"v2"'
+        result = self.cache.fetch(self.url)
+        self.assertTrue(result.changed)
+        self.assertEqual(result.content, self.body)
+        self.assertFalse(self.cache.fetch(self.url).changed)
+
+    def test_lost_body_falls_back_to_plain_get(self):
+        self.cache.fetch(self.url)
+        os.remove(self.cache._paths(self.url)[1])
+        result = self.cache.fetch(self.url)
+        self.assertTrue(result.changed)
+        self.assertEqual(result.content, self.body)
+        self.assertNotIn('If-None-Match', self.sent_headers()[1])
+
+    def test_corrupt_metadata_falls_back_to_plain_get(self):
+        self.cache.fetch(self.url)
+        with open(self.cache._paths(self.url)[0], 'w', encoding='utf-8') as f:
+            f.write('{not json')
+        result = self.cache.fetch(self.url)
+        self.assertTrue(result.changed)
+        self.assertNotIn('If-None-Match', self.sent_headers()[1])
+
+
+class ScryfallClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.backoff_base, scryfall_client.BACKOFF_BASE = scryfall_client.BACKOFF_BASE, 0.01
+        self.failures = {}    # identifier name -> responses left to fail with `fail_status`
+        self.fail_status = 500
+        self.retry_after = None
+        self.attempts = {}
+        self.stub = StubServer(self.handle)
+        self.client = ScryfallClient(base_url=self.stub.url, requests_per_sec=1000, max_retries=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.close()
+        scryfall_client.BACKOFF_BASE = self.backoff_base
+
+    def handle(self, request, body):
+        identifiers = body['identifiers']
+        key = identifiers[0]['name']
+        with self.stub.lock:
+            if self.failures.get(key, 0) > 0:
+                self.failures[key] -= 1
+                headers = {'Retry-After': self.retry_after} if self.retry_after else {}
+                return self.fail_status, headers, b'{}'
+        data = [{'id': f'id-{i["name"]}', 'name': i['name']} for i in identifiers if not i['name'].startswith('Unknown')]
+        not_found = [i for i in identifiers if i['name'].startswith('Unknown')]
+        return 200, {'Content-Type': 'application/json'}, json.dumps({'data': data, 'not_found': not_found}).encode()
+
+    def posted_batches(self):
+        return [[i['name'] for i in body['identifiers']] for method, path, _, body in self.stub.requests
+                if method == 'POST' and path == '/cards/collection']
+
+    def test_batches_of_75(self):
+        identifiers = [{'name': f'Card {n}'} for n in range(160)] + [{'name': 'Unknown Card'}]
+        cards, not_found, failed = self.client.fetch_collection(identifiers, progress=lambda msg: None)
+        self.assertEqual(sorted(c['name'] for c in cards), sorted(f'Card {n}' for n in range(160)))
+        self.assertEqual(not_found, [{'name': 'Unknown Card'}])
+        self.assertEqual(failed, [])
+        self.assertEqual(sorted(len(b) for b in self.posted_batches()), [11, 75, 75])
+
+    def test_429_is_retried_after_retry_after(self):
+        self.failures['Card 0'] = 1
+        self.fail_status, self.retry_after = 429, '0.3'
+        start = time.perf_counter()
+        cards, _, failed = self.client.fetch_collection([{'name': 'Card 0'}], progress=lambda msg: None)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+        self.assertEqual([c['name'] for c in cards], ['Card 0'])
+        self.assertEqual(failed, [])
+        self.assertEqual(len(self.posted_batches()), 2)
+
+    def test_only_failed_identifiers_are_resent(self):
+        identifiers = [{'name': f'Card {n}'} for n in range(150)]
+        # The second batch fails every attempt of the first round, then recovers
+        self.failures['Card 75'] = self.client.max_retries
+        messages = []
+        cards, _, failed = self.client.fetch_collection(identifiers, progress=messages.append)
+        self.assertEqual(len(cards), 150)
+        self.assertEqual(failed, [])
+        batches = self.posted_batches()
+        self.assertEqual(len(batches), 2 + self.client.max_retries)
+        self.assertEqual(batches[-1], [f'Card {n}' for n in range(75, 150)])
+        self.assertTrue(any('Retrying 75 failed identifier(s)' in m for m in messages))
+
+    def test_identifiers_still_failing_are_returned(self):
+        self.failures['Card 0'] = 99
+        cards, _, failed = self.client.fetch_collection([{'name': 'Card 0'}], progress=lambda msg: None)
+        self.assertEqual(cards, [])
+        self.assertEqual(failed, [{'name': 'Card 0'}])
+
+
+class ScryfallIDCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir  = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'cache', 'scryfall_ids.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_lookup_by_printing_then_name(self):
+        with ScryfallIDCache(self.path) as cache:
+            cache.add([{'id': 'id-fire', 'name': 'Fire // Ice', 'set': 'mh2', 'collector_number': '290'}])
+        with ScryfallIDCache(self.path) as cache:
+            self.assertEqual(cache.lookup({'name': 'Fire', 'set': 'mh2', 'collector_number': '290'}), 'id-fire')
+            # A printing Scryfall didn't know, resolved by name on an earlier run
+            self.assertEqual(cache.lookup({'name': 'Fire // Ice', 'set': 'xxx', 'collector_number': '999'}), 'id-fire')
+            self.assertIsNone(cache.lookup({'name': 'Counterspell', 'set': 'lea', 'collector_number': '54'}))
+
+
+if __name__ == '__main__':
+    unittest.main()